@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from logging import getLogger
 
 from fastapi import FastAPI
@@ -5,8 +6,25 @@ from uvicorn import run
 
 from app.config import DefaultSettings
 from app.config.utils import get_settings
+from app.db.connection import SessionManager, pg_listener
 from app.endpoints import list_of_routes
-from app.utils.common import get_hostname
+from app.utils.common import (
+    close_http_client,
+    external_weather_refresher,
+    get_hostname,
+    ingestion_buffer,
+    on_readings_notification,
+    partition_maintainer,
+    retention_job,
+    rollup_compactor,
+)
+from app.utils.plot import plot_renderer
+from app.utils.queries import (
+    READINGS_CHANNEL,
+    SETTINGS_CHANNEL,
+    on_settings_notification,
+)
+from app.utils.weather_predict import inference_batcher, model_registry
 
 logger = getLogger(__name__)
 
@@ -19,6 +37,38 @@ def bind_routes(application: FastAPI, setting: DefaultSettings) -> None:
         application.include_router(route, prefix=setting.PATH_PREFIX)
 
 
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    """
+    Start background jobs on startup and stop them on shutdown
+    """
+    settings = application.state.settings
+    session_manager = SessionManager()
+    await session_manager.wait_for_database(settings.DB_CONNECT_RETRY)
+    if settings.SENSOR_PARTITIONING:
+        partition_maintainer.start()
+    pg_listener.subscribe(SETTINGS_CHANNEL, on_settings_notification)
+    pg_listener.subscribe(READINGS_CHANNEL, on_readings_notification)
+    pg_listener.start()
+    ingestion_buffer.start()
+    external_weather_refresher.start()
+    rollup_compactor.start()
+    retention_job.start()
+    await model_registry.preload()
+    inference_batcher.start()
+    yield
+    await inference_batcher.stop()
+    await retention_job.stop()
+    await rollup_compactor.stop()
+    await external_weather_refresher.stop()
+    await partition_maintainer.stop()
+    await ingestion_buffer.stop()
+    await pg_listener.stop()
+    await close_http_client()
+    plot_renderer.shutdown()
+    await session_manager.dispose()
+
+
 def get_app() -> FastAPI:
     """
     Creates application and all dependable objects
@@ -31,6 +81,7 @@ def get_app() -> FastAPI:
         docs_url="/swagger",
         openapi_url="/openapi",
         version="0.1.0",
+        lifespan=lifespan,
     )
     settings = get_settings()
     bind_routes(application, settings)
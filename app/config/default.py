@@ -23,9 +23,83 @@ class DefaultSettings(BaseSettings):
     POSTGRES_USER: str = environ.get("POSTGRES_USER", "user")
     POSTGRES_PORT: int = int(environ.get("POSTGRES_PORT", "5432")[-4:])
     POSTGRES_PASSWORD: str = environ.get("POSTGRES_PASSWORD", "hackme")
-    DB_CONNECT_RETRY: int = environ.get("DB_CONNECT_RETRY", 20)
-    DB_POOL_SIZE: int = environ.get("DB_POOL_SIZE", 15)
+    DB_CONNECT_RETRY: int = int(environ.get("DB_CONNECT_RETRY", 20))
+    DB_POOL_SIZE: int = int(environ.get("DB_POOL_SIZE", 15))
+    DB_MAX_OVERFLOW: int = int(environ.get("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: float = float(environ.get("DB_POOL_TIMEOUT", 30.0))
+    DB_POOL_RECYCLE: int = int(environ.get("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING: int = int(environ.get("DB_POOL_PRE_PING", 1))
+    DB_STATEMENT_CACHE_SIZE: int = int(environ.get("DB_STATEMENT_CACHE_SIZE", 500))
+    DB_STATEMENT_TIMEOUT: int = int(environ.get("DB_STATEMENT_TIMEOUT", 30000))
+    DB_ECHO: int = int(environ.get("DB_ECHO", 0))
     USE_LOCAL_DB: int = int(environ.get("USE_LOCAL_DB", 0))
+    SETTINGS_CACHE_TTL: float = float(environ.get("SETTINGS_CACHE_TTL", 300.0))
+    LATEST_READINGS_TTL: float = float(environ.get("LATEST_READINGS_TTL", 60.0))
+    PG_LISTENER_KEEPALIVE: float = float(environ.get("PG_LISTENER_KEEPALIVE", 30.0))
+
+    SENSOR_PARTITIONING: int = int(environ.get("SENSOR_PARTITIONING", 0))
+    PARTITION_MONTHS_AHEAD: int = int(environ.get("PARTITION_MONTHS_AHEAD", 2))
+    PARTITION_MAINTENANCE_INTERVAL: int = int(
+        environ.get("PARTITION_MAINTENANCE_INTERVAL", 6 * 3600)
+    )
+
+    ROLLUP_COMPACTION_INTERVAL: int = int(environ.get("ROLLUP_COMPACTION_INTERVAL", 30))
+    ROLLUP_BATCH_SIZE: int = int(environ.get("ROLLUP_BATCH_SIZE", 50000))
+
+    RETENTION_INTERVAL: int = int(environ.get("RETENTION_INTERVAL", 3600))
+    RETENTION_BATCH_SIZE: int = int(environ.get("RETENTION_BATCH_SIZE", 5000))
+    RETENTION_BATCH_PAUSE: float = float(environ.get("RETENTION_BATCH_PAUSE", 0.1))
+
+    EXTERNAL_WEATHER_REFRESH_INTERVAL: int = int(
+        environ.get("EXTERNAL_WEATHER_REFRESH_INTERVAL", 600)
+    )
+    FORECAST_CACHE_TTL: int = int(environ.get("FORECAST_CACHE_TTL", 3600))
+
+    PLOT_RENDER_WORKERS: int = int(environ.get("PLOT_RENDER_WORKERS", 2))
+    PLOT_RENDER_CONCURRENCY: int = int(environ.get("PLOT_RENDER_CONCURRENCY", 4))
+    PLOT_RENDER_TIMEOUT: float = float(environ.get("PLOT_RENDER_TIMEOUT", 30.0))
+    PLOT_CACHE_MAX_BYTES: int = int(environ.get("PLOT_CACHE_MAX_BYTES", 32 * 2**20))
+    PLOT_CACHE_DIR: str = environ.get("PLOT_CACHE_DIR", "")
+    PLOT_CACHE_DISK_MAX_BYTES: int = int(
+        environ.get("PLOT_CACHE_DISK_MAX_BYTES", 256 * 2**20)
+    )
+
+    MODEL_PATH: str = environ.get(
+        "MODEL_PATH", "app/utils/weather_predict/best_model.pkl"
+    )
+    SCALER_PATH: str = environ.get(
+        "SCALER_PATH", "app/utils/weather_predict/scaler.pkl"
+    )
+    MODEL_MMAP_MODE: str = environ.get("MODEL_MMAP_MODE", "")
+    MODEL_RELOAD_CHECK_INTERVAL: float = float(
+        environ.get("MODEL_RELOAD_CHECK_INTERVAL", 10.0)
+    )
+    PREDICTION_CACHE_TTL: float = float(environ.get("PREDICTION_CACHE_TTL", 5.0))
+    INFERENCE_QUEUE_SIZE: int = int(environ.get("INFERENCE_QUEUE_SIZE", 1000))
+    INFERENCE_BATCH_WINDOW: float = float(environ.get("INFERENCE_BATCH_WINDOW", 0.005))
+    INFERENCE_MAX_BATCH_ROWS: int = int(environ.get("INFERENCE_MAX_BATCH_ROWS", 4096))
+    INFERENCE_TIMEOUT: float = float(environ.get("INFERENCE_TIMEOUT", 10.0))
+
+    LIVE_STREAM_QUEUE_SIZE: int = int(environ.get("LIVE_STREAM_QUEUE_SIZE", 100))
+    LIVE_STREAM_KEEPALIVE: float = float(environ.get("LIVE_STREAM_KEEPALIVE", 15.0))
+
+    HISTORY_CHUNK_SIZE: int = int(environ.get("HISTORY_CHUNK_SIZE", 5000))
+
+    BULK_UPLOAD_MAX_READINGS: int = int(environ.get("BULK_UPLOAD_MAX_READINGS", 10000))
+    INGEST_BUFFER_ENABLED: int = int(environ.get("INGEST_BUFFER_ENABLED", 0))
+    INGEST_BUFFER_MAX_SIZE: int = int(environ.get("INGEST_BUFFER_MAX_SIZE", 10000))
+    INGEST_BUFFER_BATCH_SIZE: int = int(environ.get("INGEST_BUFFER_BATCH_SIZE", 500))
+    INGEST_BUFFER_FLUSH_INTERVAL: float = float(
+        environ.get("INGEST_BUFFER_FLUSH_INTERVAL", 1.0)
+    )
+
+    HTTP_CLIENT_TIMEOUT: float = float(environ.get("HTTP_CLIENT_TIMEOUT", 10.0))
+    HTTP_CLIENT_MAX_CONNECTIONS: int = int(
+        environ.get("HTTP_CLIENT_MAX_CONNECTIONS", 10)
+    )
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = float(
+        environ.get("HTTP_CLIENT_KEEPALIVE_EXPIRY", 60.0)
+    )
 
     @property
     def database_settings(self) -> dict:
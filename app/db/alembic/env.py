@@ -1,4 +1,5 @@
 import asyncio
+import re
 
 from logging.config import fileConfig
 
@@ -30,6 +31,20 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = weather.DeclarativeBase.metadata
 
+# Monthly partitions of the sensor tables are created by the application,
+# autogenerate must not try to drop them
+PARTITION_NAME = re.compile(
+    r"^(central|outdoor|external_weather)_(y\d{4}m\d{2}|default)$"
+)
+
+
+def include_name(name, type_, parent_names) -> bool:
+    if type_ == "table":
+        return not PARTITION_NAME.match(name)
+    if type_ == "index" and parent_names.get("table_name"):
+        return not PARTITION_NAME.match(parent_names["table_name"])
+    return True
+
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -55,6 +70,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -62,7 +78,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
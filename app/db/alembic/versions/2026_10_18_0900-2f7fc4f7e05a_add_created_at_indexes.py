@@ -0,0 +1,46 @@
+"""add created_at indexes
+
+Revision ID: 2f7fc4f7e05a
+Revises: 6a78a8667cc4
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '2f7fc4f7e05a'
+down_revision: str | None = '6a78a8667cc4'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Sensor tables are append-only and rows arrive in time order, so a BRIN index
+# on created_at is tiny and keeps range scans fast regardless of table size
+TABLES = ('central', 'outdoor', 'external_weather')
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(
+                op.f(f'ix__{table}__created_at'),
+                table,
+                ['created_at'],
+                unique=False,
+                postgresql_using='brin',
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.drop_index(
+                op.f(f'ix__{table}__created_at'),
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,120 @@
+"""partition sensor tables
+
+Monthly declarative partitioning of the sensor tables by created_at.
+Optional: the tables are only converted when SENSOR_PARTITIONING=1 is set for
+`alembic upgrade`. To switch it on later, downgrade to 2f7fc4f7e05a and upgrade
+again with the variable set. New partitions are created by the application
+(see `app.utils.common.partitions`)
+
+Revision ID: d2a1180f25ef
+Revises: 2f7fc4f7e05a
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+import sqlalchemy as sa
+
+from alembic import op
+
+from app.config import get_settings
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a1180f25ef'
+down_revision: str | None = '2f7fc4f7e05a'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLES = ('central', 'outdoor', 'external_weather')
+
+
+def is_partitioned(table: str) -> bool:
+    return bool(
+        op.get_bind().scalar(
+            sa.text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :table)"
+            ),
+            {"table": table},
+        )
+    )
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_table(table: str) -> None:
+    old = f'{table}_unpartitioned'
+    op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+    op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT pk__{table} TO pk__{old}')
+    op.execute(f'ALTER INDEX ix__{table}__created_at RENAME TO ix__{old}__created_at')
+
+    op.execute(
+        f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) '
+        f'PARTITION BY RANGE (created_at)'
+    )
+    # The partition key has to be part of the primary key
+    op.execute(
+        f'ALTER TABLE {table} ADD CONSTRAINT pk__{table} PRIMARY KEY (id, created_at)'
+    )
+    op.execute(
+        f'CREATE INDEX ix__{table}__created_at ON {table} USING brin (created_at)'
+    )
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+    now = datetime.now(UTC)
+    oldest = op.get_bind().scalar(sa.text(f'SELECT min(created_at) FROM {old}'))
+    month = (oldest or now).astimezone(UTC)
+    month = month.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    # Same horizon as the partition maintainer job
+    last = add_months(month_start, get_settings().PARTITION_MONTHS_AHEAD)
+
+    while month <= last:
+        upper = add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {table}_y{month.year}m{month.month:02d} "
+            f"PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+
+    op.execute(f'INSERT INTO {table} SELECT * FROM {old}')
+    op.execute(f'DROP TABLE {old}')
+
+
+def unpartition_table(table: str) -> None:
+    old = f'{table}_partitioned'
+    op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+    op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT pk__{table} TO pk__{old}')
+    op.execute(f'ALTER INDEX ix__{table}__created_at RENAME TO ix__{old}__created_at')
+
+    op.execute(f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)')
+    op.execute(f'ALTER TABLE {table} ADD CONSTRAINT pk__{table} PRIMARY KEY (id)')
+    op.execute(
+        f'CREATE INDEX ix__{table}__created_at ON {table} USING brin (created_at)'
+    )
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+
+    op.execute(f'INSERT INTO {table} SELECT * FROM {old}')
+    op.execute(f'DROP TABLE {old} CASCADE')
+
+
+def upgrade() -> None:
+    if not get_settings().SENSOR_PARTITIONING:
+        return
+
+    for table in TABLES:
+        if not is_partitioned(table):
+            partition_table(table)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        if is_partitioned(table):
+            unpartition_table(table)
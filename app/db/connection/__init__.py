@@ -1,7 +1,10 @@
+from app.db.connection.listener import PgListener, pg_listener
 from app.db.connection.session import SessionManager, get_session, session_context
 
 __all__ = [
     "get_session",
     "session_context",
     "SessionManager",
+    "PgListener",
+    "pg_listener",
 ]
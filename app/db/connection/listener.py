@@ -0,0 +1,107 @@
+import asyncio
+
+from collections.abc import Callable
+from contextlib import suppress
+from logging import getLogger
+
+import asyncpg
+
+from app.config import get_settings
+
+logger = getLogger(__name__)
+
+MAX_RECONNECT_DELAY = 30.0
+
+
+class PgListener:
+    """
+    Keeps a dedicated connection (outside the SQLAlchemy pool) that LISTENs
+    to Postgres notification channels and calls the subscribed callbacks
+
+    Notifications sent while the connection is down are lost, so after every
+    (re)connect each callback is called with `None` as the payload, meaning
+    "anything may have changed"
+
+    Args:
+        keepalive (float): Seconds between checks that the connection is alive
+    """
+
+    def __init__(self, keepalive: float):
+        self.keepalive = keepalive
+        self._callbacks: dict[str, list[Callable[[str | None], None]]] = {}
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self, channel: str, callback: Callable[[str | None], None]) -> None:
+        """
+        Call `callback(payload)` for every notification on the channel.
+        Subscribe before `start`. Subscribing the same callback again is
+        a no-op, so restarting the application does not duplicate calls
+
+        Args:
+            channel (str): Notification channel name
+            callback (Callable): Called on the event loop, must not block
+        """
+        callbacks = self._callbacks.setdefault(channel, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task is None and self._callbacks:
+            self._task = asyncio.create_task(self._run(), name="pg-listener")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def _dispatch(self, channel: str, payload: str | None) -> None:
+        for callback in self._callbacks.get(channel, []):
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception("Notification callback for %s failed", channel)
+
+    def _on_notification(
+        self, connection: asyncpg.Connection, pid: int, channel: str, payload: str
+    ) -> None:
+        self._dispatch(channel, payload)
+
+    async def _listen(self) -> None:
+        connection = await asyncpg.connect(**get_settings().database_settings)
+        try:
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _: closed.set())
+            for channel in self._callbacks:
+                await connection.add_listener(channel, self._on_notification)
+            for channel in self._callbacks:
+                self._dispatch(channel, None)
+
+            while not closed.is_set():
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(closed.wait(), self.keepalive)
+                # A silently dropped connection is only noticed on a query
+                await connection.execute("SELECT 1")
+        finally:
+            with suppress(Exception):
+                await connection.close(timeout=5)
+
+    async def _run(self) -> None:
+        delay = 1.0
+        while True:
+            try:
+                await self._listen()
+                delay = 1.0
+            except Exception:
+                logger.exception("Notification listener disconnected, reconnecting")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+
+pg_listener = PgListener(keepalive=get_settings().PG_LISTENER_KEEPALIVE)
@@ -1,39 +1,129 @@
+import asyncio
+
 from contextlib import asynccontextmanager
+from logging import getLogger
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.config import get_settings
 
+logger = getLogger(__name__)
+
+# Delay cap between the startup connection attempts, seconds
+MAX_CONNECT_DELAY = 10.0
+
 
 class SessionManager:
     """
     A class that implements the necessary functionality for working with the database:
     issuing sessions, storing and updating connection settings
-    """
 
-    def __init__(self) -> None:
-        self.refresh()
+    The engine (with its connection pool) and the session factory are created
+    once per process, when the singleton is first instantiated
+    """
 
     def __new__(cls):
         if not hasattr(cls, "instance"):
             cls.instance = super().__new__(cls)
+            cls.instance.engine, cls.instance.session_maker = cls._create_engine()
         return cls.instance  # noqa
 
-    def get_session_maker(self) -> sessionmaker:
-        return sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
-
-    def refresh(self) -> None:
-        self.engine = create_async_engine(
-            get_settings().database_uri,
-            echo=True,
+    @staticmethod
+    def _create_engine() -> tuple[AsyncEngine, sessionmaker]:
+        settings = get_settings()
+        engine = create_async_engine(
+            settings.database_uri,
+            echo=bool(settings.DB_ECHO),
             future=True,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=bool(settings.DB_POOL_PRE_PING),
+            connect_args={
+                # Prepared statements are cached per connection by the driver
+                "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+                "server_settings": {
+                    "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT),
+                    "application_name": "meteostation",
+                },
+            },
         )
+        return engine, sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    def get_session_maker(self) -> sessionmaker:
+        return self.session_maker
+
+    async def refresh(self) -> None:
+        """
+        Re-read the connection settings and switch to a new engine
+
+        New sessions use the new engine at once. Sessions already running
+        keep their connections, which are closed when returned because
+        the old pool is disposed
+        """
+        old_engine = self.engine
+        self.engine, self.session_maker = self._create_engine()
+        await old_engine.dispose()
+
+    async def dispose(self) -> None:
+        """
+        Close all pooled connections (on shutdown)
+        """
+        await self.engine.dispose()
+
+    async def wait_for_database(self, attempts: int, delay: float = 0.5) -> None:
+        """
+        Wait until the database accepts connections, retrying with
+        exponential backoff (e.g. while its container is starting)
+
+        Args:
+            attempts (int): Maximum number of connection attempts
+            delay (float): Seconds before the second attempt, doubled each time
+
+        Raises:
+            OSError | DBAPIError: If the last attempt failed
+        """
+        for attempt in range(1, attempts + 1):
+            try:
+                async with self.engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+                return
+            except (OSError, DBAPIError) as e:
+                if attempt >= attempts:
+                    raise
+                logger.warning(
+                    "Database is not available (attempt %d/%d): %s",
+                    attempt,
+                    attempts,
+                    e,
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_CONNECT_DELAY)
+
+    def pool_metrics(self) -> dict:
+        """
+        Get the connection pool utilization
+        """
+        pool = self.engine.pool
+        max_overflow = get_settings().DB_MAX_OVERFLOW
+        capacity = pool.size() + max_overflow
+        return {
+            "size": pool.size(),
+            "max_overflow": max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            # Negative until the pool has opened `size` connections
+            "overflow": max(pool.overflow(), 0),
+            "utilization": pool.checkedout() / capacity if capacity else 0,
+        }
 
 
 async def get_session() -> AsyncSession:
-    session_maker = SessionManager().get_session_maker()
-    async with session_maker() as session:
+    async with SessionManager().session_maker() as session:
         yield session
 
 
@@ -1,3 +1,9 @@
+from app.db.models.rollup import (
+    CentralRollup,
+    ExternalWeatherRollup,
+    OutdoorRollup,
+    RollupWatermark,
+)
 from app.db.models.setting import Setting
 from app.db.models.weather import Central, ExternalWeather, Outdoor
 
@@ -6,4 +12,8 @@ __all__ = [
     "Central",
     "Outdoor",
     "ExternalWeather",
+    "CentralRollup",
+    "OutdoorRollup",
+    "ExternalWeatherRollup",
+    "RollupWatermark",
 ]
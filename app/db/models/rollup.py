@@ -0,0 +1,316 @@
+from sqlalchemy import Column
+from sqlalchemy.dialects.postgresql import (
+    BIGINT,
+    DOUBLE_PRECISION,
+    INTEGER,
+    TIMESTAMP,
+    VARCHAR,
+)
+
+from app.db import DeclarativeBase
+
+
+class CentralRollup(DeclarativeBase):
+    __tablename__ = "central_rollup"
+
+    resolution = Column(
+        INTEGER,
+        primary_key=True,
+        doc="Bucket width in seconds",
+    )
+    bucket = Column(
+        TIMESTAMP(timezone=True),
+        primary_key=True,
+        doc="Start of the time bucket",
+    )
+    samples = Column(
+        INTEGER,
+        nullable=False,
+        doc="Number of raw rows aggregated into the bucket",
+    )
+    temperature_sum = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Sum of temperature in Celsius",
+    )
+    temperature_min = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Minimum of temperature in Celsius",
+    )
+    temperature_max = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Maximum of temperature in Celsius",
+    )
+    humidity_sum = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Sum of humidity in %",
+    )
+    humidity_min = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Minimum of humidity in %",
+    )
+    humidity_max = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Maximum of humidity in %",
+    )
+    pressure_sum = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Sum of pressure in mmHg",
+    )
+    pressure_min = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Minimum of pressure in mmHg",
+    )
+    pressure_max = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Maximum of pressure in mmHg",
+    )
+    co2_sum = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Sum of CO2 in ppm",
+    )
+    co2_min = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Minimum of CO2 in ppm",
+    )
+    co2_max = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Maximum of CO2 in ppm",
+    )
+    tvoc_sum = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Sum of TVOC in ppb",
+    )
+    tvoc_min = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Minimum of TVOC in ppb",
+    )
+    tvoc_max = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Maximum of TVOC in ppb",
+    )
+
+    def __repr__(self):
+        columns = {
+            column.name: getattr(self, column.name) for column in self.__table__.columns
+        }
+        return (
+            f'<{self.__tablename__}: '
+            f'{", ".join(map(lambda x: f"{x[0]}={x[1]}", columns.items()))}>'
+        )
+
+
+class OutdoorRollup(DeclarativeBase):
+    __tablename__ = "outdoor_rollup"
+
+    resolution = Column(
+        INTEGER,
+        primary_key=True,
+        doc="Bucket width in seconds",
+    )
+    bucket = Column(
+        TIMESTAMP(timezone=True),
+        primary_key=True,
+        doc="Start of the time bucket",
+    )
+    samples = Column(
+        INTEGER,
+        nullable=False,
+        doc="Number of raw rows aggregated into the bucket",
+    )
+    temperature_sum = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Sum of temperature in Celsius",
+    )
+    temperature_min = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Minimum of temperature in Celsius",
+    )
+    temperature_max = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Maximum of temperature in Celsius",
+    )
+    humidity_sum = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Sum of humidity in %",
+    )
+    humidity_min = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Minimum of humidity in %",
+    )
+    humidity_max = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Maximum of humidity in %",
+    )
+    pressure_sum = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Sum of pressure in mmHg",
+    )
+    pressure_min = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Minimum of pressure in mmHg",
+    )
+    pressure_max = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Maximum of pressure in mmHg",
+    )
+
+    def __repr__(self):
+        columns = {
+            column.name: getattr(self, column.name) for column in self.__table__.columns
+        }
+        return (
+            f'<{self.__tablename__}: '
+            f'{", ".join(map(lambda x: f"{x[0]}={x[1]}", columns.items()))}>'
+        )
+
+
+class ExternalWeatherRollup(DeclarativeBase):
+    __tablename__ = "external_weather_rollup"
+
+    resolution = Column(
+        INTEGER,
+        primary_key=True,
+        doc="Bucket width in seconds",
+    )
+    bucket = Column(
+        TIMESTAMP(timezone=True),
+        primary_key=True,
+        doc="Start of the time bucket",
+    )
+    samples = Column(
+        INTEGER,
+        nullable=False,
+        doc="Number of raw rows aggregated into the bucket",
+    )
+    temperature_feels_like_sum = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Sum of feels like temperature in Celsius",
+    )
+    temperature_feels_like_min = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Minimum of feels like temperature in Celsius",
+    )
+    temperature_feels_like_max = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Maximum of feels like temperature in Celsius",
+    )
+    precipitation_sum = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Sum of precipitation in mm",
+    )
+    precipitation_min = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Minimum of precipitation in mm",
+    )
+    precipitation_max = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Maximum of precipitation in mm",
+    )
+    uv_index_sum = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Sum of UV index",
+    )
+    uv_index_min = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Minimum of UV index",
+    )
+    uv_index_max = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Maximum of UV index",
+    )
+    wind_speed_sum = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Sum of wind speed in m/s",
+    )
+    wind_speed_min = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Minimum of wind speed in m/s",
+    )
+    wind_speed_max = Column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        doc="Maximum of wind speed in m/s",
+    )
+
+    def __repr__(self):
+        columns = {
+            column.name: getattr(self, column.name) for column in self.__table__.columns
+        }
+        return (
+            f'<{self.__tablename__}: '
+            f'{", ".join(map(lambda x: f"{x[0]}={x[1]}", columns.items()))}>'
+        )
+
+
+# Rows with last_id < id <= next_id are the next to aggregate. next_id is the
+# highest committed id seen by a compactor run and next_xid the xmax of the same
+# snapshot. Writers that were still in flight then may hold lower ids, so the
+# rows are only aggregated once every transaction below next_xid has ended
+class RollupWatermark(DeclarativeBase):
+    __tablename__ = "rollup_watermark"
+
+    table_name = Column(
+        VARCHAR(255),
+        primary_key=True,
+        doc="Name of the raw table",
+    )
+    last_id = Column(
+        INTEGER,
+        nullable=False,
+        doc="Highest id already aggregated into the rollups",
+    )
+    next_id = Column(
+        INTEGER,
+        nullable=False,
+        doc="Highest id to aggregate on the next run",
+    )
+    next_xid = Column(
+        BIGINT,
+        nullable=False,
+        server_default="0",
+        doc="Transactions below this id must end before next_id is aggregated",
+    )
+
+    def __repr__(self):
+        columns = {
+            column.name: getattr(self, column.name) for column in self.__table__.columns
+        }
+        return (
+            f'<{self.__tablename__}: '
+            f'{", ".join(map(lambda x: f"{x[0]}={x[1]}", columns.items()))}>'
+        )
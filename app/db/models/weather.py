@@ -1,4 +1,4 @@
-from sqlalchemy import Column
+from sqlalchemy import Column, Index
 from sqlalchemy.dialects.postgresql import INTEGER, NUMERIC, TIMESTAMP, VARCHAR
 from sqlalchemy.sql import func
 
@@ -7,6 +7,7 @@ from app.db import DeclarativeBase
 
 class Central(DeclarativeBase):
     __tablename__ = "central"
+    __table_args__ = (Index(None, "created_at", postgresql_using="brin"),)
 
     id = Column(
         INTEGER,
@@ -58,6 +59,7 @@ class Central(DeclarativeBase):
 
 class Outdoor(DeclarativeBase):
     __tablename__ = "outdoor"
+    __table_args__ = (Index(None, "created_at", postgresql_using="brin"),)
 
     id = Column(
         INTEGER,
@@ -99,6 +101,7 @@ class Outdoor(DeclarativeBase):
 
 class ExternalWeather(DeclarativeBase):
     __tablename__ = "external_weather"
+    __table_args__ = (Index(None, "created_at", postgresql_using="brin"),)
 
     id = Column(
         INTEGER,
@@ -1,3 +1,4 @@
+from app.endpoints.metrics import api_router as get_metrics_router
 from app.endpoints.setting import api_router as get_setting_router
 from app.endpoints.telegram import api_router as get_telegram_router
 from app.endpoints.weather import api_router as get_weather_router
@@ -6,6 +7,7 @@ list_of_routes = [
     get_weather_router,
     get_setting_router,
     get_telegram_router,
+    get_metrics_router,
 ]
 
 
@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+from starlette import status
+
+from app.db.connection import SessionManager
+from app.utils.common import ingestion_buffer, readings_broadcaster
+from app.utils.weather_predict import inference_batcher
+
+api_router = APIRouter(tags=["Metrics"])
+
+
+@api_router.get(
+    "/metrics",
+    status_code=status.HTTP_200_OK,
+    description="Get pool usage, queue depths and statistics of the background workers",
+)
+async def get_metrics():
+    """
+    Get runtime metrics of this worker process
+    """
+    return {
+        "db_pool": SessionManager().pool_metrics(),
+        "inference": inference_batcher.metrics(),
+        "ingestion_buffer": ingestion_buffer.metrics(),
+        "live_stream": readings_broadcaster.metrics(),
+    }
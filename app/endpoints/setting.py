@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
+from starlette.background import BackgroundTask
 
 from app.db.connection import get_session
 from app.schemas import SettingPatchWithKey
@@ -21,27 +22,55 @@ async def patch_multiple_settings(
     session: AsyncSession = Depends(get_session),  # noqa: B008
 ):
     """
-    Update multiple settings in the database
+    Update multiple settings in the database with a single statement
 
     Args:
         payload (List[SettingPatchWithKey]): List of settings to update
         session (AsyncSession): The database session
+
+    Raises:
+        HTTPException: 422 if a value does not match its type
     """
-    await save_multiple_settings(session, payload)
+    try:
+        await save_multiple_settings(session, payload)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        ) from e
     return
 
 
 @api_router.get(
     "/settings/backup",
     status_code=status.HTTP_200_OK,
-    response_class=FileResponse,
+    response_class=StreamingResponse,
     description="Get backup of database",
 )
-async def get_backup():
+async def get_backup(
+    fmt: str = Query("plain", alias="format", pattern="^(plain|custom)$"),
+    compression: str = Query("gzip", pattern="^(none|gzip|zstd)$"),
+):
     """
-    Get a backup of the database via docker
+    Stream a pg_dump backup of the database as it is produced
 
-    Returns:
-        FileResponse: The backup file
+    Args:
+        fmt (str): plain (SQL script) or custom (archive for pg_restore)
+        compression (str): none, gzip or zstd
+
+    Raises:
+        HTTPException: If pg_dump could not be started (HTTP 500)
     """
-    return await create_postgres_backup()
+    try:
+        backup = await create_postgres_backup(fmt, compression)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        ) from e
+
+    return StreamingResponse(
+        backup.stream(),
+        media_type=backup.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{backup.filename}"'},
+        # Kills pg_dump if the client is gone before streaming started
+        background=BackgroundTask(backup.close),
+    )
@@ -1,49 +1,126 @@
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
+import asyncio
+
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from app.config import get_settings
 from app.db.connection import get_session
 from app.schemas import (
     CentralData,
     ExternalData,
+    HistoryFormat,
+    HistoryTable,
     SensorData,
     SensorInterval,
+    WeatherBulkReading,
     WeatherCurrentResponse,
+    WeatherPredictionRangeResponse,
     WeatherPredictionResponse,
     WeatherUploadRequest,
 )
-from app.utils.common import generate_weather_plot, new_data_logic
-from app.utils.queries import get_last_data_for_sensors, get_setting_by_key
-from app.utils.weather_predict import get_data_weather_prediction
+from app.utils.common import (
+    EXPORT_FORMATS,
+    cache_headers,
+    export_history,
+    generate_weather_plot,
+    is_not_modified,
+    live_events,
+    new_data_logic,
+)
+from app.utils.queries import (
+    LATEST_MODELS,
+    ROLLUP_RESOLUTIONS,
+    LatestSnapshot,
+    get_setting_by_key,
+    history_select,
+    insert_sensor_data_bulk,
+    latest_readings,
+)
+from app.utils.weather_predict import (
+    get_data_weather_prediction,
+    get_data_weather_prediction_range,
+    prediction_cache,
+)
 
 api_router = APIRouter(tags=["Weather"])
 
 
+@lru_cache(maxsize=1)
+def render_current_weather(snapshot: LatestSnapshot) -> bytes:
+    """
+    Serialize the current weather once per snapshot
+    """
+    formatted_data = {
+        "central": CentralData.model_validate(snapshot["central"]),
+        "outdoor": SensorData.model_validate(snapshot["outdoor"]),
+        "external_weather": ExternalData.model_validate(snapshot["external_weather"]),
+    }
+    return WeatherCurrentResponse(**formatted_data).model_dump_json().encode()
+
+
 @api_router.get(
     "/weather/current",
     status_code=status.HTTP_200_OK,
     response_model=WeatherCurrentResponse,
+    responses={304: {"description": "Not modified since the ETag / date sent"}},
     description="Get current weather",
 )
 async def get_current_weather(
+    request: Request,
     session: AsyncSession = Depends(get_session),  # noqa: B008
 ):
     """
     Get current weather data based on the last data
 
+    The latest rows are served from the in-memory snapshot with ETag and
+    Last-Modified, so pollers sending If-None-Match / If-Modified-Since
+    get 304 Not Modified until new readings arrive
+
     Args:
-        session (AsyncSession): The database session
+        request (Request): The incoming request
+        session (AsyncSession): The database session (used on a cold start)
     """
-    raw_data = await get_last_data_for_sensors(session)
+    snapshot = await latest_readings.get(session)
+    headers = cache_headers(snapshot.etag, snapshot.last_modified)
 
-    formatted_data = {
-        "central": CentralData.model_validate(raw_data["central"]),
-        "outdoor": SensorData.model_validate(raw_data["outdoor"]),
-        "external_weather": ExternalData.model_validate(raw_data["external_weather"]),
-    }
+    if is_not_modified(request, snapshot.etag, snapshot.last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(
+        content=render_current_weather(snapshot),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@api_router.get(
+    "/weather/stream",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+    description="Live stream of new sensor readings (Server-Sent Events)",
+)
+async def stream_weather(request: Request):
+    """
+    Push the current readings and then every new Central, Outdoor and
+    ExternalWeather row as it is written, by any worker. A bulk upload sends
+    one event per reading; a client that falls LIVE_STREAM_QUEUE_SIZE events
+    behind is disconnected and gets the current readings on reconnect
 
-    return WeatherCurrentResponse(**formatted_data)
+    Args:
+        request (Request): The incoming request
+    """
+    return StreamingResponse(
+        live_events(request),
+        media_type="text/event-stream",
+        # Disable response buffering in nginx
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @api_router.get(
@@ -60,11 +137,65 @@ async def get_weather_prediction(
 
     Args:
         session (AsyncSession): The database session
+
+    Raises:
+        HTTPException: If the prediction model is not available
+                       or inference is overloaded (HTTP 503)
     """
-    data = await get_data_weather_prediction(session)
+    try:
+        data = await get_data_weather_prediction(session)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prediction model is not available",
+        ) from None
+    except (asyncio.QueueFull, TimeoutError):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prediction is overloaded, retry later",
+            headers={"Retry-After": "1"},
+        ) from None
     return WeatherPredictionResponse(**data)
 
 
+@api_router.get(
+    "/weather/predict/range",
+    status_code=status.HTTP_200_OK,
+    response_model=WeatherPredictionRangeResponse,
+    description="Get weather predictions for every reading of a time range",
+)
+async def get_weather_prediction_range(
+    session: AsyncSession = Depends(get_session),  # noqa: B008
+    hours: int = Query(24, ge=1, le=24 * 365),  # 1 hour - 1 year
+):
+    """
+    Get weather predictions made from the aggregated readings
+    of the last specified hours
+
+    Args:
+        session (AsyncSession): The database session
+        hours (int): The number of hours of readings (default: 24, range: 1-8760)
+
+    Raises:
+        HTTPException: If the prediction model is not available
+                       or inference is overloaded (HTTP 503)
+    """
+    try:
+        data = await get_data_weather_prediction_range(session, hours)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prediction model is not available",
+        ) from None
+    except (asyncio.QueueFull, TimeoutError):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prediction is overloaded, retry later",
+            headers={"Retry-After": "1"},
+        ) from None
+    return WeatherPredictionRangeResponse(**data)
+
+
 @api_router.get(
     "/weather/interval",
     status_code=status.HTTP_200_OK,
@@ -87,7 +218,8 @@ async def get_sensor_poll_interval(
 @api_router.get(
     "/weather/plot",
     status_code=status.HTTP_200_OK,
-    response_class=StreamingResponse,
+    response_class=Response,
+    responses={200: {"content": {"image/png": {}}}},
     description="Get plot of sensor data",
 )
 async def get_weather_plot(
@@ -100,8 +232,77 @@ async def get_weather_plot(
     Args:
         session (AsyncSession): The database session
         hours (int): The number of hours to plot data for (default: 6, range: 1-168)
+
+    Raises:
+        HTTPException: If the plot could not be rendered in time (HTTP 503)
+    """
+    try:
+        png = await generate_weather_plot(session, hours)
+    except TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Plot rendering is overloaded, retry later",
+            headers={"Retry-After": "5"},
+        ) from None
+    return Response(content=png, media_type="image/png")
+
+
+@api_router.get(
+    "/weather/history",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {media_type: {} for media_type, _ in EXPORT_FORMATS.values()}}
+    },
+    description="Export stored sensor history as CSV, NDJSON, Arrow or Parquet",
+)
+async def get_weather_history(
+    table: HistoryTable = Query(HistoryTable.central),  # noqa: B008
+    start: datetime | None = Query(  # noqa: B008
+        None, description="Default: end - 24h"
+    ),
+    end: datetime | None = Query(None, description="Default: now"),  # noqa: B008
+    resolution: int = Query(0, description="0 for raw rows or 60, 600, 3600"),
+    fmt: HistoryFormat = Query(HistoryFormat.csv, alias="format"),  # noqa: B008
+):
+    """
+    Stream the history of a sensor table for a time range
+
+    Rows are read with a server-side cursor and encoded chunk by chunk,
+    so any range can be exported without holding it in memory
+
+    Args:
+        table (HistoryTable): The table to export
+        start (datetime | None): The earliest reading (inclusive, UTC if naive)
+        end (datetime | None): The latest reading (exclusive, UTC if naive)
+        resolution (int): 0 for raw rows, otherwise a rollup resolution in seconds
+        fmt (HistoryFormat): Output format
+
+    Raises:
+        HTTPException: If the range or resolution is invalid (HTTP 422)
     """
-    return await generate_weather_plot(session, hours)
+    end = end or datetime.now(UTC)
+    start = start or end - timedelta(hours=24)
+    start, end = (t if t.tzinfo else t.replace(tzinfo=UTC) for t in (start, end))
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="start must be earlier than end",
+        )
+    if resolution and resolution not in ROLLUP_RESOLUTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"resolution must be 0 or one of {ROLLUP_RESOLUTIONS}",
+        )
+
+    stmt = history_select(LATEST_MODELS[table], start, end, resolution)
+    media_type, extension = EXPORT_FORMATS[fmt]
+    filename = f"{table}_{start:%Y%m%dT%H%M%S}_{end:%Y%m%dT%H%M%S}.{extension}"
+    return StreamingResponse(
+        export_history(stmt, fmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @api_router.post(
@@ -119,6 +320,48 @@ async def upload_weather_data(
     Args:
         payload (WeatherUploadRequest): The data to be uploaded
         session (AsyncSession): The database session
+
+    Raises:
+        HTTPException: If the ingestion buffer is full (HTTP 429)
     """
-    await new_data_logic(session=session, payload=payload)
+    try:
+        await new_data_logic(session=session, payload=payload)
+    except asyncio.QueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Ingestion buffer is full, retry later",
+            headers={"Retry-After": "1"},
+        ) from None
+    return
+
+
+@api_router.post(
+    "/weather/upload/bulk",
+    status_code=status.HTTP_200_OK,
+    description="Upload a batch of buffered sensor readings with device timestamps",
+)
+async def upload_weather_data_bulk(
+    payload: list[WeatherBulkReading],
+    session: AsyncSession = Depends(get_session),  # noqa: B008
+):
+    """
+    Upload readings that the station buffered while offline
+    All readings are written with multi-row inserts in one transaction
+
+    Args:
+        payload (list[WeatherBulkReading]): Readings with device-side timestamps
+        session (AsyncSession): The database session
+
+    Raises:
+        HTTPException: If the batch is larger than BULK_UPLOAD_MAX_READINGS (HTTP 413)
+    """
+    max_readings = get_settings().BULK_UPLOAD_MAX_READINGS
+    if len(payload) > max_readings:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Too many readings in one batch (max {max_readings})",
+        )
+
+    await insert_sensor_data_bulk(session, payload)
+    prediction_cache.invalidate()
     return
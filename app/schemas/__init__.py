@@ -2,9 +2,14 @@ from app.schemas.setting import SettingPatchWithKey
 from app.schemas.weather import (
     CentralData,
     ExternalData,
+    HistoryFormat,
+    HistoryTable,
     SensorData,
     SensorInterval,
+    WeatherBulkReading,
     WeatherCurrentResponse,
+    WeatherPredictionPoint,
+    WeatherPredictionRangeResponse,
     WeatherPredictionResponse,
     WeatherUploadRequest,
 )
@@ -16,6 +21,11 @@ __all__ = [
     "ExternalData",
     "WeatherCurrentResponse",
     "WeatherPredictionResponse",
+    "WeatherPredictionPoint",
+    "WeatherPredictionRangeResponse",
     "WeatherUploadRequest",
+    "WeatherBulkReading",
     "SensorInterval",
+    "HistoryTable",
+    "HistoryFormat",
 ]
@@ -1,18 +1,28 @@
-from pydantic import BaseModel, Field
+from datetime import UTC, datetime
+from enum import StrEnum
+
+from pydantic import BaseModel, Field, field_validator
+
+# Limits of the columns the readings are stored in: NUMERIC(4,1),
+# NUMERIC(6,1) and INTEGER. Values outside them are rejected with 422
+# instead of failing the insert
+NUMERIC_4_1 = {"ge": -999.9, "le": 999.9}
+NUMERIC_6_1 = {"ge": -99999.9, "le": 99999.9}
+INTEGER = {"ge": -(2**31), "le": 2**31 - 1}
 
 
 class SensorData(BaseModel):
-    temperature: float = Field(..., title="Sensor temperature")
-    humidity: float = Field(..., title="Sensor humidity")
-    pressure: float = Field(..., title="Sensor pressure")
+    temperature: float = Field(..., title="Sensor temperature", **NUMERIC_4_1)
+    humidity: float = Field(..., title="Sensor humidity", **NUMERIC_4_1)
+    pressure: float = Field(..., title="Sensor pressure", **NUMERIC_6_1)
 
     class Config:
         from_attributes = True
 
 
 class CentralData(SensorData):
-    co2: int = Field(..., title="Sensor CO2 level")
-    tvoc: int = Field(..., title="Sensor TVOC level")
+    co2: int = Field(..., title="Sensor CO2 level", **INTEGER)
+    tvoc: int = Field(..., title="Sensor TVOC level", **INTEGER)
 
     class Config:
         from_attributes = True
@@ -40,11 +50,35 @@ class WeatherPredictionResponse(BaseModel):
     predicted_rain: bool = Field(..., title="Predicted rain")
 
 
+class WeatherPredictionPoint(WeatherPredictionResponse):
+    created_at: datetime = Field(..., title="Start of the readings bucket")
+    predicted_for: datetime = Field(..., title="Time the prediction is made for")
+
+
+class WeatherPredictionRangeResponse(BaseModel):
+    resolution: int = Field(..., title="Bucket width of the readings in seconds")
+    predictions: list[WeatherPredictionPoint]
+
+
 class WeatherUploadRequest(BaseModel):
     central: CentralData
     outdoor: SensorData
 
 
+class WeatherBulkReading(WeatherUploadRequest):
+    created_at: datetime = Field(..., title="Device-side time of the reading")
+
+    @field_validator("created_at")
+    @classmethod
+    def assume_utc(cls, value: datetime) -> datetime:
+        """
+        Stations without timezone info report time in UTC
+        """
+        if value.tzinfo is None:
+            return value.replace(tzinfo=UTC)
+        return value
+
+
 class SensorInterval(BaseModel):
     sensor_poll_interval_ms: int = Field(
         ..., title="Sensor polling interval in milliseconds"
@@ -52,3 +86,16 @@ class SensorInterval(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class HistoryTable(StrEnum):
+    central = "central"
+    outdoor = "outdoor"
+    external_weather = "external_weather"
+
+
+class HistoryFormat(StrEnum):
+    csv = "csv"
+    ndjson = "ndjson"
+    arrow = "arrow"
+    parquet = "parquet"
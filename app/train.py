@@ -0,0 +1,258 @@
+"""
+Train the weather prediction model from the sensor history stored in the database
+
+Features are built from the hourly Central rollups with the same code the
+predictor uses (`app.utils.weather_predict.features`), the targets are the
+Outdoor temperature and rain (External precipitation > 0) `--horizon` hours
+later. The result is a versioned artifact bundle that the model registry
+hot-reloads once MODEL_PATH points to it
+
+Usage:
+    python -m app.train [--horizon 6] [--estimators 200] [--no-activate]
+"""
+
+import argparse
+import asyncio
+import os
+
+from datetime import UTC, datetime
+from logging import basicConfig, getLogger
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error
+from sklearn.preprocessing import StandardScaler
+
+from app.config import get_settings
+from app.db.connection import SessionManager, session_context
+from app.db.models import Central, ExternalWeather, Outdoor
+from app.utils.queries import stream_rollup_data
+from app.utils.weather_predict import (
+    LAGGED_FEATURE_COLUMNS,
+    build_features,
+    hourly_frame,
+)
+
+logger = getLogger(__name__)
+
+# Hourly history read for training: raw model -> output name -> column
+HISTORY = {
+    Central: {
+        "Temperature": Central.temperature,
+        "Humidity": Central.humidity,
+        "Pressure (mmHg)": Central.pressure,
+    },
+    Outdoor: {"Temperature": Outdoor.temperature},
+    ExternalWeather: {"precipitation": ExternalWeather.precipitation},
+}
+
+# Fewer samples than this do not make a meaningful model
+MIN_TRAIN_ROWS = 100
+
+
+async def load_hourly_history(chunk_size: int) -> dict[type, pd.DataFrame]:
+    """
+    Stream the hourly rollups of every source in chunks
+
+    Only compact float32 frames are kept, so memory stays bounded even for
+    years of history (one row per hour and source)
+
+    Args:
+        chunk_size (int): Number of rows fetched from the cursor at once
+
+    Returns:
+        dict[type, pd.DataFrame]: Hourly averages per raw model
+    """
+    history = {}
+    async with session_context() as session:
+        for model, columns in HISTORY.items():
+            frames = []
+            async for rows in stream_rollup_data(
+                session, model, columns, 3600, chunk_size
+            ):
+                frames.append(hourly_frame(rows))
+            history[model] = pd.concat(frames) if frames else hourly_frame([])
+            logger.info(
+                "Loaded %d hours of %s", len(history[model]), model.__tablename__
+            )
+
+    await SessionManager().dispose()
+    return history
+
+
+def build_dataset(
+    history: dict[type, pd.DataFrame], horizon: int
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Build the feature matrix and the targets `horizon` hours ahead
+
+    Args:
+        history (dict[type, pd.DataFrame]): Hourly averages per raw model
+        horizon (int): Prediction horizon in hours
+
+    Returns:
+        tuple[pd.DataFrame, np.ndarray]: Features and [temperature, rain] targets
+    """
+    central = history[Central]
+    features = build_features(
+        central["Temperature"],
+        central["Humidity"],
+        central["Pressure (mmHg)"],
+        central.index,
+        hourly=central,
+        columns=LAGGED_FEATURE_COLUMNS,
+    )
+
+    target_at = central.index + pd.Timedelta(hours=horizon)
+    temperature = history[Outdoor]["Temperature"].reindex(target_at).to_numpy()
+    precipitation = history[ExternalWeather]["precipitation"].reindex(target_at)
+    rain = np.where(precipitation.isna(), np.nan, precipitation > 0)
+
+    known = ~np.isnan(temperature) & ~np.isnan(rain)
+    targets = np.column_stack([temperature, rain])[known]
+    return features[known].reset_index(drop=True), targets
+
+
+def fit(
+    features: pd.DataFrame, targets: np.ndarray, estimators: int
+) -> tuple[StandardScaler, RandomForestRegressor]:
+    scaler = StandardScaler().fit(features)
+    # n_jobs=-1 builds the trees on all cores through joblib
+    model = RandomForestRegressor(n_estimators=estimators, n_jobs=-1, random_state=0)
+    model.fit(scaler.transform(features), targets)
+    return scaler, model
+
+
+def evaluate(
+    features: pd.DataFrame,
+    targets: np.ndarray,
+    estimators: int,
+    test_fraction: float,
+) -> dict:
+    """
+    Fit on the older part of the history and score on the most recent one
+
+    Returns:
+        dict: Temperature MAE and rain accuracy on the held-out part
+    """
+    split = int(len(features) * (1 - test_fraction))
+    scaler, model = fit(features[:split], targets[:split], estimators)
+    predicted = model.predict(scaler.transform(features[split:]))
+    return {
+        "train_rows": split,
+        "test_rows": len(features) - split,
+        "temperature_mae": float(
+            mean_absolute_error(targets[split:, 0], predicted[:, 0])
+        ),
+        "rain_accuracy": float(
+            np.mean((predicted[:, 1] >= 0.5) == (targets[split:, 1] >= 0.5))
+        ),
+    }
+
+
+def save_artifact(artifact: dict, output_dir: Path) -> Path:
+    """
+    Write the artifact bundle under a versioned name
+
+    Returns:
+        Path: Path of the written artifact
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"weather-model-{artifact['version']}.joblib"
+    # Not compressed, so the registry can memory-map the arrays
+    joblib.dump(artifact, path)
+    return path
+
+
+def activate_artifact(path: Path, link: Path) -> None:
+    """
+    Atomically point the model path used by the registry to the artifact
+    """
+    if link.exists() and not link.is_symlink():
+        logger.warning(
+            "%s is a regular file, not replacing it. Set MODEL_PATH=%s to use "
+            "the new model",
+            link,
+            path,
+        )
+        return
+
+    tmp = link.with_name(f"{link.name}.tmp")
+    tmp.unlink(missing_ok=True)
+    tmp.symlink_to(os.path.relpath(path, link.parent))
+    tmp.replace(link)
+    logger.info("%s now points to %s", link, path)
+
+
+def parse_args() -> argparse.Namespace:
+    model_path = Path(get_settings().MODEL_PATH)
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--horizon", type=int, default=6, help="Prediction horizon in hours"
+    )
+    parser.add_argument(
+        "--estimators", type=int, default=200, help="Number of trees in the forest"
+    )
+    parser.add_argument(
+        "--test-fraction",
+        type=float,
+        default=0.2,
+        help="Most recent part of the history used to score the model",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=10000, help="Rows fetched at once"
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=model_path.parent,
+        help="Directory for the versioned artifacts",
+    )
+    parser.add_argument(
+        "--no-activate",
+        action="store_true",
+        help=f"Do not point {model_path} to the new artifact",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    basicConfig(level="INFO", format="%(asctime)s %(levelname)s %(message)s")
+    args = parse_args()
+
+    history = asyncio.run(load_hourly_history(args.chunk_size))
+    features, targets = build_dataset(history, args.horizon)
+    if len(features) < MIN_TRAIN_ROWS:
+        raise SystemExit(
+            f"Not enough history to train: {len(features)} hours with known "
+            f"targets, at least {MIN_TRAIN_ROWS} needed"
+        )
+
+    metrics = evaluate(features, targets, args.estimators, args.test_fraction)
+    logger.info("Held-out metrics: %s", metrics)
+
+    scaler, model = fit(features, targets, args.estimators)
+    trained_at = datetime.now(UTC)
+    artifact = {
+        "version": trained_at.strftime("%Y%m%d%H%M%S"),
+        "trained_at": trained_at.isoformat(),
+        "model": model,
+        "scaler": scaler,
+        "features": list(features.columns),
+        "horizon_hours": args.horizon,
+        "metrics": metrics,
+        "rows": len(features),
+    }
+    path = save_artifact(artifact, args.output_dir)
+    logger.info("Saved %s", path)
+
+    if not args.no_activate:
+        activate_artifact(path, Path(get_settings().MODEL_PATH))
+
+
+if __name__ == "__main__":
+    main()
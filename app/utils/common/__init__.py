@@ -1,10 +1,40 @@
-from app.utils.common.get_backup import create_postgres_backup
+from app.utils.common.export import EXPORT_FORMATS, export_history
+from app.utils.common.get_backup import PostgresBackup, create_postgres_backup
 from app.utils.common.get_weather import generate_weather_plot, new_data_logic
 from app.utils.common.hostname import get_hostname
+from app.utils.common.http_cache import cache_headers, is_not_modified
+from app.utils.common.http_client import close_http_client, get_http_client
+from app.utils.common.ingest_buffer import ingestion_buffer
+from app.utils.common.live import (
+    live_events,
+    on_readings_notification,
+    readings_broadcaster,
+)
+from app.utils.common.partitions import partition_maintainer
+from app.utils.common.periodic import PeriodicTask
+from app.utils.common.retention import retention_job
+from app.utils.common.rollups import rollup_compactor
+from app.utils.common.weather_refresher import external_weather_refresher
 
 __all__ = [
     "new_data_logic",
     "generate_weather_plot",
     "get_hostname",
+    "cache_headers",
+    "is_not_modified",
+    "get_http_client",
+    "close_http_client",
+    "ingestion_buffer",
+    "live_events",
+    "on_readings_notification",
+    "readings_broadcaster",
     "create_postgres_backup",
+    "PostgresBackup",
+    "EXPORT_FORMATS",
+    "export_history",
+    "PeriodicTask",
+    "partition_maintainer",
+    "external_weather_refresher",
+    "rollup_compactor",
+    "retention_job",
 ]
@@ -0,0 +1,192 @@
+import asyncio
+import csv
+import io
+import json
+
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from sqlalchemy import DateTime, Float, Integer, Select
+from sqlalchemy.engine import Row
+
+from app.config import get_settings
+from app.db.connection import session_context
+from app.utils.queries import stream_history
+
+# Export format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class HistoryEncoder(ABC):
+    """
+    Incremental encoder of query rows: the output of `header`, every
+    `encode` call and `finish` concatenated is the complete file
+
+    Args:
+        stmt (Select): The query whose rows are encoded
+    """
+
+    def __init__(self, stmt: Select):
+        self.columns = [column.name for column in stmt.selected_columns]
+
+    def header(self) -> bytes:
+        return b""
+
+    @abstractmethod
+    def encode(self, rows: list[Row]) -> bytes:
+        """
+        Encode the next chunk of rows
+        """
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class CsvEncoder(HistoryEncoder):
+    def header(self) -> bytes:
+        return self.encode([self.columns])
+
+    def encode(self, rows: list[Row]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+
+class NdjsonEncoder(HistoryEncoder):
+    def encode(self, rows: list[Row]) -> bytes:
+        lines = (
+            json.dumps(dict(zip(self.columns, row, strict=True)), default=_isoformat)
+            for row in rows
+        )
+        return "".join(f"{line}\n" for line in lines).encode()
+
+
+class ChunkSink(io.RawIOBase):
+    """
+    Write-only file object that keeps written bytes until they are taken
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ArrowEncoder(HistoryEncoder):
+    """
+    Arrow IPC stream: one record batch per chunk of rows
+    """
+
+    def __init__(self, stmt: Select):
+        super().__init__(stmt)
+        self.schema = pa.schema(
+            [
+                (column.name, _arrow_type(column.type))
+                for column in stmt.selected_columns
+            ]
+        )
+        self.sink = ChunkSink()
+        self.writer = self._open_writer()
+
+    def _open_writer(self):
+        return pa.ipc.new_stream(self.sink, self.schema)
+
+    def header(self) -> bytes:
+        return self.sink.take()
+
+    def encode(self, rows: list[Row]) -> bytes:
+        arrays = [
+            pa.array(values, type=field.type)
+            for values, field in zip(zip(*rows, strict=True), self.schema, strict=True)
+        ]
+        self.writer.write(pa.Table.from_arrays(arrays, schema=self.schema))
+        return self.sink.take()
+
+    def finish(self) -> bytes:
+        self.writer.close()
+        return self.sink.take()
+
+
+class ParquetEncoder(ArrowEncoder):
+    """
+    Parquet file: one row group per chunk of rows, the footer is written
+    by `finish`
+    """
+
+    def _open_writer(self):
+        return pq.ParquetWriter(self.sink, self.schema, compression="zstd")
+
+
+ENCODERS = {
+    "csv": CsvEncoder,
+    "ndjson": NdjsonEncoder,
+    "arrow": ArrowEncoder,
+    "parquet": ParquetEncoder,
+}
+
+
+def _isoformat(value: datetime) -> str:
+    return value.isoformat()
+
+
+def _arrow_type(type_):
+    if isinstance(type_, DateTime):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(type_, Float):
+        return pa.float64()
+    if isinstance(type_, Integer):
+        return pa.int64()
+    return pa.string()
+
+
+async def export_history(stmt: Select, fmt: str) -> AsyncIterator[bytes]:
+    """
+    Stream the rows of a history query encoded in the given format
+
+    Rows are read through a server-side cursor in chunks of
+    HISTORY_CHUNK_SIZE and every chunk is encoded in a worker thread as soon
+    as it arrives, so memory stays flat whatever the time range. Uses its
+    own session, because the response body outlives the request handler
+
+    Args:
+        stmt (Select): Query built by `history_select`
+        fmt (str): One of EXPORT_FORMATS
+
+    Yields:
+        bytes: Consecutive parts of the encoded file
+    """
+    encoder = ENCODERS[fmt](stmt)
+    yield encoder.header()
+
+    async with session_context() as session:
+        async for rows in stream_history(
+            session, stmt, get_settings().HISTORY_CHUNK_SIZE
+        ):
+            yield await asyncio.to_thread(encoder.encode, rows)
+
+    yield encoder.finish()
@@ -1,54 +1,197 @@
+import asyncio
 import os
-import subprocess
-import tempfile
 
-from fastapi.responses import FileResponse
+from collections.abc import AsyncIterator
+from contextlib import suppress
+from datetime import UTC, datetime
 
 from app.config import get_settings
 
+# Backup format -> (pg_dump --format, file extension)
+BACKUP_FORMATS = {
+    "plain": ("plain", "sql"),
+    "custom": ("custom", "dump"),
+}
+BACKUP_COMPRESSIONS = ("none", "gzip", "zstd")
 
-async def create_postgres_backup() -> FileResponse:
+# Bytes read from pg_dump at once
+BACKUP_CHUNK_SIZE = 64 * 1024
+
+
+class PostgresBackup:
     """
-    Create a backup of the PostgreSQL database using pg_dump installed in the container.
+    pg_dump running as an asyncio subprocess, its output is streamed
+    as it is produced: nothing is written to disk and the event loop
+    is never blocked
 
-    Returns:
-        FileResponse: The backup file
+    pg_dump reads from its own MVCC snapshot over a separate connection,
+    so ingestion keeps going while the backup runs. gzip is done by pg_dump
+    itself (inside the archive for the custom format), zstd by piping the
+    output through the `zstd` tool, since pg_dump supports it only from
+    version 16
+
+    Args:
+        fmt (str): One of BACKUP_FORMATS
+        compression (str): One of BACKUP_COMPRESSIONS
+
+    Raises:
+        ValueError: If the format or the compression is unknown
     """
-    settings = get_settings()
-    db_host = settings.POSTGRES_HOST
-    db_name = settings.POSTGRES_DB
-    db_user = settings.POSTGRES_USER
-    db_port = settings.POSTGRES_PORT
-    db_password = settings.POSTGRES_PASSWORD
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".sql") as tmp:
-        dump_path = tmp.name
+    def __init__(self, fmt: str = "plain", compression: str = "gzip"):
+        if fmt not in BACKUP_FORMATS:
+            raise ValueError(f"Unknown backup format: {fmt}")
+        if compression not in BACKUP_COMPRESSIONS:
+            raise ValueError(f"Unknown backup compression: {compression}")
+        self.fmt = fmt
+        self.compression = compression
+        self._processes: list[asyncio.subprocess.Process] = []
+        self._stderr: list[asyncio.Task] = []
+        self._output: asyncio.StreamReader | None = None
+        self._first_chunk = b""
+
+    @property
+    def filename(self) -> str:
+        _, extension = BACKUP_FORMATS[self.fmt]
+        name = f"backup_{datetime.now(UTC):%Y%m%d_%H%M%S}.{extension}"
+        if self.compression == "zstd":
+            return f"{name}.zst"
+        if self.compression == "gzip" and self.fmt == "plain":
+            return f"{name}.gz"
+        return name
 
-    env = os.environ.copy()
-    env["PGPASSWORD"] = db_password  # secure way to pass password
+    @property
+    def media_type(self) -> str:
+        if self.compression == "zstd":
+            return "application/zstd"
+        if self.fmt == "custom":
+            return "application/octet-stream"
+        if self.compression == "gzip":
+            return "application/gzip"
+        return "application/sql"
 
-    result = subprocess.run(
-        [
+    def _pg_dump_args(self) -> list[str]:
+        settings = get_settings()
+        pg_format, _ = BACKUP_FORMATS[self.fmt]
+        return [
             "pg_dump",
             "-h",
-            db_host,
+            settings.POSTGRES_HOST,
             "-p",
-            str(db_port),
+            str(settings.POSTGRES_PORT),
             "-U",
-            db_user,
+            settings.POSTGRES_USER,
             "-d",
-            db_name,
+            settings.POSTGRES_DB,
             "-F",
-            "plain",
-            "-f",
-            dump_path,
-        ],
-        env=env,
-    )
-
-    if result.returncode != 0:
-        raise RuntimeError("pg_dump failed to create backup")
-
-    return FileResponse(
-        path=dump_path, filename="backup.sql", media_type="application/sql"
-    )
+            pg_format,
+            "-Z",
+            "6" if self.compression == "gzip" else "0",
+        ]
+
+    async def _spawn(self, *args: str, **kwargs) -> asyncio.subprocess.Process:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *args, stderr=asyncio.subprocess.PIPE, **kwargs
+            )
+        except FileNotFoundError:
+            raise RuntimeError(f"{args[0]} is not installed") from None
+        self._processes.append(process)
+        # Read concurrently, so a chatty process never blocks on a full pipe
+        self._stderr.append(asyncio.create_task(process.stderr.read()))
+        return process
+
+    async def start(self) -> None:
+        """
+        Start pg_dump and wait for the first output
+
+        Raises:
+            RuntimeError: If pg_dump (or zstd) is missing or fails right away
+        """
+        env = {**os.environ, "PGPASSWORD": get_settings().POSTGRES_PASSWORD}
+        try:
+            if self.compression == "zstd":
+                read_fd, write_fd = os.pipe()
+                try:
+                    await self._spawn(*self._pg_dump_args(), stdout=write_fd, env=env)
+                    compressor = await self._spawn(
+                        "zstd",
+                        "-q",
+                        "-c",
+                        stdin=read_fd,
+                        stdout=asyncio.subprocess.PIPE,
+                    )
+                finally:
+                    os.close(read_fd)
+                    os.close(write_fd)
+                self._output = compressor.stdout
+            else:
+                dump = await self._spawn(
+                    *self._pg_dump_args(), stdout=asyncio.subprocess.PIPE, env=env
+                )
+                self._output = dump.stdout
+
+            self._first_chunk = await self._output.read(BACKUP_CHUNK_SIZE)
+            if not self._first_chunk:
+                await self._check()
+        except BaseException:
+            await self.close()
+            raise
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        """
+        Yield the backup as it is produced. If the consumer stops early
+        (e.g. the client disconnected) the processes are killed
+
+        Raises:
+            RuntimeError: If pg_dump failed, so the consumer can abort
+                          instead of keeping a truncated backup
+        """
+        try:
+            if self._first_chunk:
+                yield self._first_chunk
+            while chunk := await self._output.read(BACKUP_CHUNK_SIZE):
+                yield chunk
+            await self._check()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """
+        Kill the processes if they are still running (idempotent)
+        """
+        for process in self._processes:
+            if process.returncode is None:
+                with suppress(ProcessLookupError):
+                    process.kill()
+            await process.wait()
+        for task in self._stderr:
+            task.cancel()
+
+    async def _check(self) -> None:
+        for process, stderr in zip(self._processes, self._stderr, strict=True):
+            if await process.wait() != 0:
+                message = (await stderr).decode(errors="replace").strip()
+                raise RuntimeError(f"Backup failed: {message or process.returncode}")
+
+
+async def create_postgres_backup(
+    fmt: str = "plain", compression: str = "gzip"
+) -> PostgresBackup:
+    """
+    Start a backup of the PostgreSQL database using pg_dump installed in the container
+
+    Args:
+        fmt (str): plain (SQL script) or custom (archive for pg_restore)
+        compression (str): none, gzip or zstd
+
+    Returns:
+        PostgresBackup: The running backup, read it with `stream()`
+
+    Raises:
+        ValueError: If the format or the compression is unknown
+        RuntimeError: If pg_dump could not be started or failed right away
+    """
+    backup = PostgresBackup(fmt, compression)
+    await backup.start()
+    return backup
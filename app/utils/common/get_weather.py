@@ -1,25 +1,29 @@
-import io
-import math
+import time
 
-from datetime import datetime, timedelta
+from datetime import UTC, datetime, timedelta
+from functools import partial
 
 import httpx
-import matplotlib.pyplot as plt
 import pandas as pd
-import seaborn as sns
 
-from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
+from app.db.connection import session_context
 from app.db.models import Central, ExternalWeather, Outdoor
 from app.schemas import WeatherUploadRequest
+from app.utils.common.http_client import get_http_client
+from app.utils.common.ingest_buffer import ingestion_buffer
+from app.utils.plot import plot_cache, plot_renderer, render_weather_plot
 from app.utils.queries import (
-    fetch_part_data,
+    choose_rollup_resolution,
+    fetch_rollup_data,
+    get_rollup_watermarks,
     get_setting_by_key,
     insert_sensor_data,
-    save_external_weather,
 )
 from app.utils.telegram import get_bot
+from app.utils.weather_predict import prediction_cache
 
 WEATHER_CODES = {
     0: "Ясно",
@@ -44,6 +48,73 @@ WEATHER_CODES = {
 }
 
 
+# Plotted parameters of every source: output name -> aggregated column
+PLOT_SOURCES = {
+    "central": (
+        Central,
+        {
+            "temperature": Central.temperature,
+            "humidity": Central.humidity,
+            "co2": Central.co2,
+            "tvoc": Central.tvoc,
+        },
+    ),
+    "outdoor": (
+        Outdoor,
+        {
+            "temperature": Outdoor.temperature,
+            "humidity": Outdoor.humidity,
+            "pressure": Outdoor.pressure,
+        },
+    ),
+    "external": (
+        ExternalWeather,
+        {
+            "temperature": ExternalWeather.temperature_feels_like,
+            "precipitation": ExternalWeather.precipitation,
+            "uv_index": ExternalWeather.uv_index,
+            "wind_speed": ExternalWeather.wind_speed,
+        },
+    ),
+}
+# Upper bound for the number of buckets per line on a plot
+PLOT_MAX_POINTS = 1500
+
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+
+
+class ForecastCacheEntry:
+    """
+    Hourly forecast downloaded from open-meteo.com for one location
+    together with the validators needed for a conditional request
+    """
+
+    def __init__(
+        self,
+        data: dict,
+        ttl: float,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = time.monotonic() + ttl
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def prolong(self, ttl: float) -> None:
+        """
+        Mark the cached forecast as fresh again (server answered 304 Not Modified)
+        """
+        self.expires_at = time.monotonic() + ttl
+
+
+forecast_cache: dict[tuple[float, float], ForecastCacheEntry] = {}
+
+
 def find_nearest_hour_index(time_list):
     now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
     now_hour = now.isoformat()[:13]  # "2025-05-23T19"
@@ -53,9 +124,72 @@ def find_nearest_hour_index(time_list):
     return -1
 
 
+async def fetch_forecast(lat: float, lon: float) -> dict:
+    """
+    Get the hourly forecast for the given location
+
+    The whole forecast is cached per (latitude, longitude) and served for every
+    hour it covers until FORECAST_CACHE_TTL expires. After that the forecast is
+    re-validated with a conditional request and downloaded only if it changed
+
+    Args:
+        lat (float): Latitude of the station
+        lon (float): Longitude of the station
+
+    Returns:
+        Dict: The raw open-meteo.com response
+    """
+    ttl = get_settings().FORECAST_CACHE_TTL
+    key = (lat, lon)
+    entry = forecast_cache.get(key)
+
+    if entry and not entry.expired:
+        time_list = entry.data.get("hourly", {}).get("time", [])
+        if find_nearest_hour_index(time_list) >= 0:
+            return entry.data
+
+    headers = {}
+    if entry and entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry and entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+
+    response = await get_http_client().get(
+        OPEN_METEO_URL,
+        params={
+            "latitude": lat,
+            "longitude": lon,
+            "current_weather": "true",
+            "hourly": (
+                "apparent_temperature,precipitation,uv_index,"
+                "weather_code,wind_speed_10m"
+            ),
+            "timezone": "UTC",
+        },
+        headers=headers,
+    )
+
+    if entry and response.status_code == httpx.codes.NOT_MODIFIED:
+        entry.prolong(ttl)
+        return entry.data
+
+    response.raise_for_status()
+
+    for cached_key in [k for k, v in forecast_cache.items() if v.expired]:
+        del forecast_cache[cached_key]
+
+    forecast_cache[key] = ForecastCacheEntry(
+        data=response.json(),
+        ttl=ttl,
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+    )
+    return forecast_cache[key].data
+
+
 async def get_external_weather(session: AsyncSession) -> dict:
     """
-    Fetches the current weather data from the open-meteo.com API
+    Gets the weather for the current hour from the open-meteo.com forecast
     based on latitude, longitude settings
 
     Args:
@@ -68,17 +202,7 @@ async def get_external_weather(session: AsyncSession) -> dict:
     lat = await get_setting_by_key(session, "latitude")
     lon = await get_setting_by_key(session, "longitude")
 
-    url = (
-        f"https://api.open-meteo.com/v1/forecast"
-        f"?latitude={lat}&longitude={lon}"
-        f"&current_weather=true"
-        f"&hourly=apparent_temperature,precipitation,uv_index"
-        f"&timezone=UTC"
-    )
-
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.get(url)
-        data = response.json()
+    data = await fetch_forecast(lat, lon)
 
     current = data.get("current_weather", {})
     hourly = data.get("hourly", {})
@@ -91,14 +215,18 @@ async def get_external_weather(session: AsyncSession) -> dict:
             return hourly[key][index]
         return None
 
+    weather_code = get_hourly_value("weather_code")
+    wind_speed = get_hourly_value("wind_speed_10m")
+
     return {
         "weather_description": WEATHER_CODES.get(
-            current.get("weathercode"), "Нет данных"
+            current.get("weathercode") if weather_code is None else weather_code,
+            "Нет данных",
         ),
         "temperature_feels_like": get_hourly_value("apparent_temperature"),
         "precipitation": get_hourly_value("precipitation"),
         "uv_index": get_hourly_value("uv_index"),
-        "wind_speed": current.get("windspeed"),
+        "wind_speed": current.get("windspeed") if wind_speed is None else wind_speed,
     }
 
 
@@ -107,14 +235,26 @@ async def new_data_logic(
     payload: WeatherUploadRequest,
 ) -> None:
     """
-    Handles the logic for inserting new sensor data and fetching external weather data
+    Handles the logic for inserting new sensor data
     Check if parameters are bigger than default values (co2, tvoc) and notifies the user
 
+    External weather is refreshed by a background job on its own cadence,
+    see `app.utils.common.weather_refresher`
+    When the ingestion buffer is enabled the data is only queued here
+    and written later with a group commit
+
     Args:
         session (AsyncSession): The database session
         payload (WeatherUploadRequest): The payload containing sensor data
+
+    Raises:
+        asyncio.QueueFull: If the ingestion buffer is full
     """
-    await insert_sensor_data(session, payload)
+    if ingestion_buffer.accepting:
+        ingestion_buffer.put(payload)
+    else:
+        await insert_sensor_data(session, payload)
+        prediction_cache.invalidate()
 
     tvoc_alert_threshold = await get_setting_by_key(session, "tvoc_alert_threshold")
     co2_alert_threshold = await get_setting_by_key(session, "co2_alert_threshold")
@@ -133,127 +273,70 @@ async def new_data_logic(
             f"TVOC: {payload.central.tvoc} ppb",
         )
 
-    external_weather = await get_external_weather(session)
-    await save_external_weather(session, external_weather)
-
 
-async def generate_weather_plot(session: AsyncSession, hours: int) -> StreamingResponse:
+async def render_plot(hours: int, resolution: int) -> bytes:
     """
-    Generates a plot of the weather data for the last specified hours
-    and returns it as a StreamingResponse
+    Read aggregated data for the last specified hours from the rollup tables
+    and render it in the plot renderer process pool
+
+    Uses its own session, because the result is shared by every request
+    waiting for the same plot and must outlive the one that started it
 
     Args:
-        session (AsyncSession): The database session
         hours (int): The number of hours to plot data for
+        resolution (int): Rollup resolution to read
 
     Returns:
-        StreamingResponse: A streaming response containing the plot image
+        bytes: The PNG image
     """
-    time_threshold = datetime.utcnow() - timedelta(hours=hours)
+    time_threshold = datetime.now(UTC) - timedelta(hours=hours)
 
-    # Получаем данные
-    central_data = await fetch_part_data(session, Central, time_threshold)
-    outdoor_data = await fetch_part_data(session, Outdoor, time_threshold)
-    external_data = await fetch_part_data(session, ExternalWeather, time_threshold)
+    frames = []
+    async with session_context() as session:
+        for source, (model, columns) in PLOT_SOURCES.items():
+            rows = await fetch_rollup_data(
+                session, model, columns, time_threshold, resolution
+            )
+            if rows:
+                df = pd.DataFrame.from_records(rows, columns=list(rows[0]._fields))
+                df["source"] = source
+                frames.append(df)
 
-    if not (central_data or outdoor_data or external_data):
+    if not frames:
         raise ValueError("No valid data found")
 
-    frames = []
-
-    if central_data:
-        df = pd.DataFrame(
-            [
-                {
-                    "created_at": row.created_at,
-                    "temperature": row.temperature,
-                    "humidity": row.humidity,
-                    "co2": row.co2,
-                    "tvoc": row.tvoc,
-                }
-                for row in central_data
-            ]
-        )
-        if not df.empty:
-            df["source"] = "central"
-            frames.append(df)
-
-    if outdoor_data:
-        df = pd.DataFrame(
-            [
-                {
-                    "created_at": row.created_at,
-                    "temperature": row.temperature,
-                    "humidity": row.humidity,
-                    "pressure": row.pressure,
-                }
-                for row in outdoor_data
-            ]
-        )
-        if not df.empty:
-            df["source"] = "outdoor"
-            frames.append(df)
-
-    if external_data:
-        df = pd.DataFrame(
-            [
-                {
-                    "created_at": row.created_at,
-                    "temperature": row.temperature_feels_like,
-                    "precipitation": row.precipitation,
-                    "uv_index": row.uv_index,
-                    "wind_speed": row.wind_speed,
-                }
-                for row in external_data
-            ]
-        )
-        if not df.empty:
-            df["source"] = "external"
-            frames.append(df)
+    df = pd.concat(frames, ignore_index=True)
+    df["created_at"] = pd.to_datetime(df["created_at"])
 
-    if not frames:
-        raise ValueError("Нет валидных данных с полем created_at")
+    return await plot_renderer.render(render_weather_plot, df, hours)
 
-    full_df = pd.concat(frames, ignore_index=True)
-    full_df = full_df[full_df["created_at"].notnull()].copy()
-    full_df["created_at"] = pd.to_datetime(full_df["created_at"])
-    full_df = full_df.sort_values("created_at")
-    full_df.set_index("created_at", inplace=True)
 
-    for col in full_df.columns:
-        if col != "source":
-            full_df[col] = pd.to_numeric(full_df[col], errors="coerce")
+async def generate_weather_plot(session: AsyncSession, hours: int) -> bytes:
+    """
+    Generates a plot of the weather data for the last specified hours
 
-    full_df["source"] = full_df["source"].astype("category")
+    Data is read from the rollup tables at the finest resolution that keeps
+    the number of buckets under PLOT_MAX_POINTS, so the amount of read rows
+    does not depend on how often the sensors are polled
 
-    df = full_df.groupby("source", observed=True).resample("10min").mean().reset_index()
+    Rendered images are cached by (hours, resolution, current time bucket,
+    rollup watermarks): a plot is rebuilt when a new bucket starts or when
+    new readings are aggregated, and identical concurrent requests share
+    one render
 
-    parameters = [col for col in df.columns if col not in ("created_at", "source")]
+    Args:
+        session (AsyncSession): The database session
+        hours (int): The number of hours to plot data for
 
-    if not parameters:
-        raise ValueError("Нет данных для отображения")
+    Returns:
+        bytes: The PNG image
 
-    sns.set(style="whitegrid")
-    n = len(parameters)
-    ncols = 2
-    nrows = math.ceil(n / ncols)
+    Raises:
+        TimeoutError: If the plot renderer is overloaded or the render hangs
+    """
+    resolution = choose_rollup_resolution(timedelta(hours=hours), PLOT_MAX_POINTS)
+    bucket = int(datetime.now(UTC).timestamp()) // resolution
+    watermarks = await get_rollup_watermarks(session)
+    key = ("weather", hours, resolution, bucket, tuple(sorted(watermarks.items())))
 
-    fig, axes = plt.subplots(
-        nrows=nrows, ncols=ncols, figsize=(16, 4 * nrows), sharex=True
-    )
-    axes = axes.flatten()
-
-    for ax, param in zip(axes, parameters, strict=False):
-        sns.lineplot(data=df, x="created_at", y=param, hue="source", ax=ax)
-        ax.set_title(f"{param} за последние {hours} ч.")
-        ax.set_ylabel(param)
-        ax.set_xlabel("Время")
-        ax.tick_params(axis="x", rotation=45)
-
-    plt.tight_layout()
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    plt.close()
-    buf.seek(0)
-
-    return StreamingResponse(buf, media_type="image/png")
+    return await plot_cache.get_or_create(key, partial(render_plot, hours, resolution))
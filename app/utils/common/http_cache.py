@@ -0,0 +1,57 @@
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request
+
+
+def cache_headers(etag: str, last_modified: datetime | None) -> dict[str, str]:
+    """
+    Validator headers for a response that clients should revalidate
+    on every request
+
+    Args:
+        etag (str): Quoted entity tag of the response
+        last_modified (datetime | None): Time the data last changed
+
+    Returns:
+        dict[str, str]: ETag, Last-Modified and Cache-Control headers
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            last_modified.astimezone(UTC), usegmt=True
+        )
+    return headers
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: datetime | None
+) -> bool:
+    """
+    Check the conditional request headers (RFC 9110, section 13.2.2):
+    If-None-Match is used when present, otherwise If-Modified-Since
+
+    Args:
+        request (Request): The incoming request
+        etag (str): Quoted entity tag of the current response
+        last_modified (datetime | None): Time the data last changed
+
+    Returns:
+        bool: True if the client copy is current and 304 can be returned
+    """
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("If-Modified-Since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    # HTTP dates have a one second resolution
+    return last_modified.replace(microsecond=0) <= since
@@ -0,0 +1,40 @@
+import httpx
+
+from app.config import get_settings
+
+client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the application-wide HTTP client
+
+    The client is created on first use and keeps connections alive (HTTP/2 when
+    the server supports it), so repeated calls to the same API reuse one
+    TLS session instead of doing a handshake per request
+
+    Returns:
+        httpx.AsyncClient: The shared HTTP client
+    """
+    global client
+    if client is None or client.is_closed:
+        settings = get_settings()
+        client = httpx.AsyncClient(
+            http2=True,
+            timeout=settings.HTTP_CLIENT_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+            ),
+        )
+    return client
+
+
+async def close_http_client() -> None:
+    """
+    Close the application-wide HTTP client and release its connections
+    """
+    global client
+    if client is not None:
+        await client.aclose()
+        client = None
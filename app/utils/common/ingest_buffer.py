@@ -0,0 +1,209 @@
+import asyncio
+
+from datetime import UTC, datetime
+from logging import getLogger
+
+from sqlalchemy.exc import DBAPIError
+
+from app.config import get_settings
+from app.db.connection import session_context
+from app.schemas import WeatherBulkReading, WeatherUploadRequest
+from app.utils.queries import insert_sensor_data_bulk
+from app.utils.weather_predict import prediction_cache
+
+logger = getLogger(__name__)
+
+# How many times a batch is retried while the application is shutting down
+SHUTDOWN_FLUSH_ATTEMPTS = 3
+MAX_RETRY_DELAY = 30.0
+
+# SQLSTATE classes of errors that retrying cannot fix:
+# data exceptions (e.g. numeric overflow) and integrity violations
+REJECTED_SQLSTATE_CLASSES = ("22", "23")
+
+
+def is_rejected(exc: Exception) -> bool:
+    """
+    Check whether the database rejected the data itself, as opposed to
+    a transient failure (connection lost, timeout, ...)
+    """
+    if not isinstance(exc, DBAPIError):
+        return False
+    sqlstate = getattr(exc.orig, "sqlstate", None) or ""
+    return sqlstate[:2] in REJECTED_SQLSTATE_CLASSES
+
+
+class IngestionBuffer:
+    """
+    In-process write-behind buffer for sensor uploads
+
+    Uploads are stamped with the time they were accepted and put into a bounded
+    queue. A background flusher writes them with group commits as soon as
+    `batch_size` readings are collected or `flush_interval` seconds have passed.
+    When the queue is full `put` raises asyncio.QueueFull, so the caller can
+    apply backpressure. On shutdown the queue is drained before returning
+
+    Transient failures are retried with backoff. If the database rejects
+    a batch, it is written reading by reading and only the readings rejected
+    on their own are logged and dropped
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+    ) -> None:
+        self.enabled = enabled
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue[WeatherBulkReading] | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+    def start(self) -> None:
+        """
+        Create the queue and start the flusher (no-op if the buffer is disabled)
+        """
+        if not self.enabled or self._task is not None:
+            return
+        self._stopping = False
+        self.queue = asyncio.Queue(maxsize=self.max_size)
+        self._task = asyncio.create_task(self._run(), name="ingestion-buffer")
+
+    async def stop(self) -> None:
+        """
+        Stop accepting uploads and wait until everything queued is written
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        await self._task
+        self._task = None
+
+    def metrics(self) -> dict:
+        """
+        Get the queue depth of the buffer
+        """
+        return {
+            "enabled": self.enabled,
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "max_size": self.max_size,
+        }
+
+    @property
+    def accepting(self) -> bool:
+        return self._task is not None and not self._stopping
+
+    def put(self, payload: WeatherUploadRequest) -> None:
+        """
+        Queue an upload for writing
+
+        Args:
+            payload (WeatherUploadRequest): The payload containing sensor data
+
+        Raises:
+            asyncio.QueueFull: If the buffer has no free space
+        """
+        reading = WeatherBulkReading(
+            central=payload.central,
+            outdoor=payload.outdoor,
+            created_at=datetime.now(UTC),
+        )
+        self.queue.put_nowait(reading)
+
+    async def _run(self) -> None:
+        while not (self._stopping and self.queue.empty()):
+            batch = await self._collect()
+            if batch:
+                await self._flush(batch)
+
+    async def _collect(self) -> list[WeatherBulkReading]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        batch = []
+
+        while len(batch) < self.batch_size:
+            if self._stopping:
+                try:
+                    batch.append(self.queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    break
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except TimeoutError:
+                break
+
+        return batch
+
+    async def _flush(self, batch: list[WeatherBulkReading]) -> None:
+        delay = self.flush_interval
+        attempt = 0
+        pending = list(batch)
+
+        while pending:
+            attempt += 1
+            try:
+                await self._write(pending)
+            except Exception:
+                if self._stopping and attempt >= SHUTDOWN_FLUSH_ATTEMPTS:
+                    logger.exception(
+                        "Dropping %d buffered readings after %d attempts",
+                        len(pending),
+                        attempt,
+                    )
+                    break
+                logger.exception(
+                    "Failed to flush %d buffered readings, retrying", len(pending)
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+
+        prediction_cache.invalidate()
+
+    async def _write(self, pending: list[WeatherBulkReading]) -> None:
+        """
+        Write the readings with one group commit, or one by one if the database
+        rejects the batch. Written and dropped readings are removed from
+        `pending`, so after a transient error only the rest is retried
+        """
+        try:
+            async with session_context() as session:
+                await insert_sensor_data_bulk(session, pending)
+            pending.clear()
+            return
+        except Exception as e:
+            if not is_rejected(e):
+                raise
+            logger.warning(
+                "Batch of %d readings rejected, writing them one by one", len(pending)
+            )
+
+        while pending:
+            try:
+                async with session_context() as session:
+                    await insert_sensor_data_bulk(session, pending[:1])
+            except Exception as e:
+                if not is_rejected(e):
+                    raise
+                logger.error(
+                    "Dropping a reading rejected by the database: %s (%s)",
+                    pending[0].model_dump_json(),
+                    e.orig,
+                )
+            del pending[0]
+
+
+ingestion_buffer = IngestionBuffer(
+    enabled=bool(get_settings().INGEST_BUFFER_ENABLED),
+    max_size=get_settings().INGEST_BUFFER_MAX_SIZE,
+    batch_size=get_settings().INGEST_BUFFER_BATCH_SIZE,
+    flush_interval=get_settings().INGEST_BUFFER_FLUSH_INTERVAL,
+)
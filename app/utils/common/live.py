@@ -0,0 +1,145 @@
+import asyncio
+import json
+
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from fastapi import Request
+
+from app.config import get_settings
+from app.db.connection import session_context
+from app.utils.queries import LATEST_MODELS, latest_readings, reading_payload
+
+
+def sse_event(data: str, event: str = "reading") -> bytes:
+    """
+    Format a Server-Sent Event (`data` must be a single line, e.g. JSON)
+    """
+    return f"event: {event}\ndata: {data}\n\n".encode()
+
+
+class Subscriber:
+    def __init__(self, queue_size: int):
+        # None marks the end of the stream
+        self.queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=queue_size)
+
+
+class ReadingsBroadcaster:
+    """
+    In-process fan-out of new readings to the live stream clients
+
+    Every event is encoded once and put into a bounded queue per client.
+    A client that falls `queue_size` events behind is dropped (its stream
+    ends and it can reconnect) instead of slowing down the others or
+    growing memory
+
+    Args:
+        queue_size (int): Events buffered per client
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: set[Subscriber] = set()
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def publish(self, event: bytes) -> None:
+        """
+        Queue an encoded event for every client, dropping the clients
+        whose queue is full
+        """
+        self.published += 1
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+
+    def metrics(self) -> dict:
+        """
+        Get the number of clients and delivery statistics
+        """
+        return {
+            "clients": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+    def _drop(self, subscriber: Subscriber) -> None:
+        self.unsubscribe(subscriber)
+        self.dropped += 1
+        # Make room for the end of stream marker
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+
+readings_broadcaster = ReadingsBroadcaster(
+    queue_size=get_settings().LIVE_STREAM_QUEUE_SIZE,
+)
+
+
+def on_readings_notification(payload: str | None) -> None:
+    """
+    Handle a READINGS_CHANNEL notification sent by any worker: update
+    the latest readings snapshot and push the readings to the clients
+    """
+    if payload is None:
+        # Readings may have been missed while the listener was disconnected
+        latest_readings.invalidate()
+        return
+
+    rows = {}
+    for table, values in json.loads(payload).items():
+        values["created_at"] = datetime.fromisoformat(values["created_at"])
+        rows[table] = LATEST_MODELS[table](**values)
+    latest_readings.update(**rows)
+    readings_broadcaster.publish(sse_event(payload))
+
+
+async def live_events(request: Request) -> AsyncIterator[bytes]:
+    """
+    Server-Sent Events stream for one client: the current readings first,
+    then every new reading as it is written. A comment is sent every
+    LIVE_STREAM_KEEPALIVE seconds to keep proxies from closing the connection
+
+    Args:
+        request (Request): The client request, checked for disconnects
+
+    Yields:
+        bytes: Encoded events
+    """
+    keepalive = get_settings().LIVE_STREAM_KEEPALIVE
+    # Subscribe first, so nothing written after the snapshot is missed
+    subscriber = readings_broadcaster.subscribe()
+    try:
+        async with session_context() as session:
+            snapshot = await latest_readings.get(session)
+        current = {
+            table: reading_payload(table, row)
+            for table, row in snapshot.rows.items()
+            if row is not None
+        }
+        yield sse_event(json.dumps(current))
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), keepalive)
+            except TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield b": keepalive\n\n"
+                continue
+            if event is None:
+                return
+            yield event
+    finally:
+        readings_broadcaster.unsubscribe(subscriber)
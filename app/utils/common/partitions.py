@@ -0,0 +1,34 @@
+from logging import getLogger
+
+from app.config import get_settings
+from app.db.connection import session_context
+from app.utils.common.periodic import PeriodicTask
+from app.utils.queries import (
+    PARTITIONED_TABLES,
+    create_monthly_partitions,
+    is_partitioned,
+)
+
+logger = getLogger(__name__)
+
+
+async def maintain_partitions() -> None:
+    """
+    Make sure every partitioned sensor table has partitions for the current
+    month and PARTITION_MONTHS_AHEAD months ahead
+    """
+    months_ahead = get_settings().PARTITION_MONTHS_AHEAD
+    async with session_context() as session:
+        for table in PARTITIONED_TABLES:
+            if not await is_partitioned(session, table):
+                continue
+            created = await create_monthly_partitions(session, table, months_ahead)
+            if created:
+                logger.info("Created partitions %s", ", ".join(created))
+
+
+partition_maintainer = PeriodicTask(
+    "partition-maintainer",
+    maintain_partitions,
+    interval=get_settings().PARTITION_MAINTENANCE_INTERVAL,
+)
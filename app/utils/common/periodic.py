@@ -0,0 +1,61 @@
+import asyncio
+
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    A background job that runs a coroutine function every `interval` seconds
+    for as long as the application is alive
+
+    Failures are logged and do not stop the loop, so a flaky dependency
+    only costs one iteration
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[None]],
+        interval: float,
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """
+        Schedule the job on the running event loop (no-op if already started)
+        """
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        """
+        Cancel the job and wait until it is finished
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.func()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Periodic task %s failed", self.name)
+            await asyncio.sleep(self.interval)
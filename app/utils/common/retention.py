@@ -0,0 +1,117 @@
+import asyncio
+
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from logging import getLogger
+
+from app.config import get_settings
+from app.db.connection import session_context
+from app.utils.common.periodic import PeriodicTask
+from app.utils.queries import (
+    ROLLUP_RESOLUTIONS,
+    ROLLUPS,
+    delete_raw_batch,
+    delete_rollup_batch,
+    drop_expired_partitions,
+    get_rollup_watermarks,
+    get_setting_by_key,
+    is_partitioned,
+)
+
+logger = getLogger(__name__)
+
+# Retention periods in days are kept in the `settings` table, 0 or no row
+# means "keep forever"
+RAW_RETENTION_KEY = "retention_raw_days"
+ROLLUP_RETENTION_KEY = "retention_rollup_{resolution}_days"
+
+
+async def delete_in_batches(
+    delete_batch: Callable[[int], Awaitable[int]], batch_size: int, pause: float
+) -> int:
+    """
+    Call `delete_batch` until it deletes less than a full batch,
+    pausing between batches so autovacuum and writers can keep up
+
+    Args:
+        delete_batch (Callable): Deletes up to the given number of rows
+        batch_size (int): Batch size passed to the delete function
+        pause (float): Seconds to sleep between batches
+
+    Returns:
+        int: Total number of deleted rows
+    """
+    total = 0
+    while True:
+        deleted = await delete_batch(batch_size)
+        total += deleted
+        if deleted < batch_size:
+            return total
+        await asyncio.sleep(pause)
+
+
+async def apply_retention() -> None:
+    """
+    Remove raw sensor rows and rollup buckets that are older than
+    the retention periods configured in the settings
+
+    Raw rows are only removed once they are aggregated into the rollups.
+    Whole monthly partitions are dropped when the table is partitioned,
+    the rest is deleted in short batched transactions
+    """
+    config = get_settings()
+    batch_size, pause = config.RETENTION_BATCH_SIZE, config.RETENTION_BATCH_PAUSE
+    now = datetime.now(UTC)
+
+    async with session_context() as session:
+        raw_days = await get_setting_by_key(session, RAW_RETENTION_KEY)
+        watermarks = await get_rollup_watermarks(session)
+
+        for model, (rollup, _) in ROLLUPS.items():
+            table = model.__tablename__
+            max_id = watermarks.get(table, 0)
+
+            if raw_days:
+                cutoff = now - timedelta(days=raw_days)
+                if await is_partitioned(session, table):
+                    dropped = await drop_expired_partitions(
+                        session, table, cutoff, max_id
+                    )
+                    if dropped:
+                        logger.info("Dropped partitions %s", ", ".join(dropped))
+
+                deleted = await delete_in_batches(
+                    partial(delete_raw_batch, session, model, cutoff, max_id),
+                    batch_size,
+                    pause,
+                )
+                if deleted:
+                    logger.info("Deleted %d expired rows from %s", deleted, table)
+
+            for resolution in ROLLUP_RESOLUTIONS:
+                key = ROLLUP_RETENTION_KEY.format(resolution=resolution)
+                days = await get_setting_by_key(session, key)
+                if not days:
+                    continue
+
+                cutoff = now - timedelta(days=days)
+                deleted = await delete_in_batches(
+                    partial(delete_rollup_batch, session, rollup, resolution, cutoff),
+                    batch_size,
+                    pause,
+                )
+                if deleted:
+                    logger.info(
+                        "Deleted %d expired %ds buckets from %s",
+                        deleted,
+                        resolution,
+                        rollup.__tablename__,
+                    )
+
+
+retention_job = PeriodicTask(
+    "retention",
+    apply_retention,
+    interval=get_settings().RETENTION_INTERVAL,
+)
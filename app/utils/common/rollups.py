@@ -0,0 +1,22 @@
+from app.config import get_settings
+from app.db.connection import session_context
+from app.utils.common.periodic import PeriodicTask
+from app.utils.queries import ROLLUPS, compact_rollup_batch
+
+
+async def compact_rollups() -> None:
+    """
+    Fold all new raw rows of every sensor table into the rollup tables
+    """
+    batch_size = get_settings().ROLLUP_BATCH_SIZE
+    for model in ROLLUPS:
+        async with session_context() as session:
+            while await compact_rollup_batch(session, model, batch_size):
+                pass
+
+
+rollup_compactor = PeriodicTask(
+    "rollup-compactor",
+    compact_rollups,
+    interval=get_settings().ROLLUP_COMPACTION_INTERVAL,
+)
@@ -0,0 +1,31 @@
+from app.config import get_settings
+from app.db.connection import session_context
+from app.utils.common.get_weather import get_external_weather
+from app.utils.common.periodic import PeriodicTask
+from app.utils.queries import save_external_weather
+
+
+class ExternalWeatherRefresher(PeriodicTask):
+    """
+    Background job that fetches the forecast from open-meteo.com on its own
+    cadence, saves it to the external_weather table and keeps the latest value
+    in memory, so sensor uploads never wait on the third-party API
+    """
+
+    def __init__(self, interval: float) -> None:
+        super().__init__("external-weather-refresher", self.refresh, interval)
+        self.latest: dict | None = None
+
+    async def refresh(self) -> None:
+        """
+        Fetch the current external weather and store it
+        """
+        async with session_context() as session:
+            external_weather = await get_external_weather(session)
+            await save_external_weather(session, external_weather)
+        self.latest = external_weather
+
+
+external_weather_refresher = ExternalWeatherRefresher(
+    interval=get_settings().EXTERNAL_WEATHER_REFRESH_INTERVAL,
+)
@@ -0,0 +1,11 @@
+from app.utils.plot.cache import PlotCache, plot_cache
+from app.utils.plot.render import render_weather_plot
+from app.utils.plot.renderer import PlotRenderer, plot_renderer
+
+__all__ = [
+    "PlotCache",
+    "plot_cache",
+    "PlotRenderer",
+    "plot_renderer",
+    "render_weather_plot",
+]
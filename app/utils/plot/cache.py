@@ -0,0 +1,139 @@
+import asyncio
+import hashlib
+import os
+
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from contextlib import suppress
+from logging import getLogger
+from pathlib import Path
+
+from app.config import get_settings
+
+logger = getLogger(__name__)
+
+
+class PlotCache:
+    """
+    Cache of rendered images with LRU eviction by total size in memory
+    and an optional directory tier shared between workers
+
+    Concurrent requests for the same key share one computation
+
+    Args:
+        max_bytes (int): Memory budget for the cached images
+        disk_dir (str): Directory for the disk tier, empty to disable it
+        disk_max_bytes (int): Budget of the disk tier
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: str = "", disk_max_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self.size = 0
+        self._entries: OrderedDict[Hashable, bytes] = OrderedDict()
+        self._pending: dict[Hashable, asyncio.Future[bytes]] = {}
+
+    async def get_or_create(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[bytes]],
+    ) -> bytes:
+        """
+        Get a cached image or build it with the factory
+
+        Args:
+            key (Hashable): Cache key, its repr must be stable between processes
+            factory (Callable): Coroutine function building the image
+
+        Returns:
+            bytes: The image
+        """
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            return data
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._load(key, factory))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda future: self._forget(key, future))
+
+        # A cancelled caller must not cancel the computation other callers wait for
+        return await asyncio.shield(pending)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        self._pending.pop(key, None)
+        if not future.cancelled() and future.exception() is not None:
+            logger.debug("Plot %r failed: %s", key, future.exception())
+
+    async def _load(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[bytes]],
+    ) -> bytes:
+        data = await asyncio.to_thread(self._read_disk, key)
+        if data is None:
+            data = await factory()
+            await asyncio.to_thread(self._write_disk, key, data)
+        self._store(key, data)
+        return data
+
+    def _store(self, key: Hashable, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        self._entries[key] = data
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def _disk_path(self, key: Hashable) -> Path:
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return self.disk_dir / f"{digest}.png"
+
+    def _read_disk(self, key: Hashable) -> bytes | None:
+        if self.disk_dir is None:
+            return None
+        try:
+            return self._disk_path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key: Hashable, data: bytes) -> None:
+        if self.disk_dir is None:
+            return
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        path = self._disk_path(key)
+        # Write under a unique name and rename, so readers never see a partial file
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        files = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith(".png"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            with suppress(FileNotFoundError):
+                os.remove(path)
+            total -= size
+
+
+plot_cache = PlotCache(
+    max_bytes=get_settings().PLOT_CACHE_MAX_BYTES,
+    disk_dir=get_settings().PLOT_CACHE_DIR,
+    disk_max_bytes=get_settings().PLOT_CACHE_DISK_MAX_BYTES,
+)
@@ -0,0 +1,82 @@
+import io
+import math
+
+import matplotlib
+import pandas as pd
+import seaborn as sns
+
+from matplotlib.figure import Figure
+
+
+def init_worker() -> None:
+    """
+    Prepare a rendering process: headless backend and the plot theme.
+    The global matplotlib state is only touched here, once per process
+    """
+    matplotlib.use("Agg")
+    sns.set_theme(style="whitegrid")
+
+
+def render_weather_plot(df: pd.DataFrame, hours: int) -> bytes:
+    """
+    Render aggregated sensor data to a PNG image
+
+    Runs in a worker process of the plot renderer, so it only uses
+    the object-oriented Figure API and never the global pyplot state
+
+    Args:
+        df (pd.DataFrame): Rows with `created_at`, `source` and `<param>`,
+                           `<param>_min`, `<param>_max` for every parameter
+        hours (int): The number of hours the data covers
+
+    Returns:
+        bytes: The PNG image
+    """
+    parameters = [
+        col
+        for col in df.columns
+        if col not in ("created_at", "source") and not col.endswith(("_min", "_max"))
+    ]
+
+    if not parameters:
+        raise ValueError("Нет данных для отображения")
+
+    sources = list(df["source"].unique())
+    palette = dict(zip(sources, sns.color_palette(n_colors=len(sources)), strict=True))
+    n = len(parameters)
+    ncols = 2
+    nrows = math.ceil(n / ncols)
+
+    fig = Figure(figsize=(16, 4 * nrows))
+    axes = fig.subplots(nrows=nrows, ncols=ncols, sharex=True, squeeze=False)
+    axes = axes.flatten()
+
+    for ax, param in zip(axes, parameters, strict=False):
+        sns.lineplot(
+            data=df,
+            x="created_at",
+            y=param,
+            hue="source",
+            hue_order=sources,
+            palette=palette,
+            ax=ax,
+        )
+        # Shade the min-max range of every bucket around the average line
+        for source, group in df.groupby("source", sort=False):
+            ax.fill_between(
+                group["created_at"],
+                group[f"{param}_min"],
+                group[f"{param}_max"],
+                color=palette[source],
+                alpha=0.15,
+                linewidth=0,
+            )
+        ax.set_title(f"{param} за последние {hours} ч.")
+        ax.set_ylabel(param)
+        ax.set_xlabel("Время")
+        ax.tick_params(axis="x", rotation=45)
+
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
@@ -0,0 +1,100 @@
+import asyncio
+
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import suppress
+from functools import partial
+from logging import getLogger
+from multiprocessing import get_context
+
+from app.config import get_settings
+from app.utils.plot.render import init_worker
+
+logger = getLogger(__name__)
+
+
+class PlotRenderer:
+    """
+    Renders images in a pool of worker processes, so matplotlib neither blocks
+    the event loop nor shares pyplot state between concurrent requests
+
+    Args:
+        workers (int): Number of rendering processes
+        concurrency (int): Maximum number of renders in flight, the rest wait
+        timeout (float): Seconds a render may take, including the wait for a slot.
+                         A render that times out keeps its slot until the worker
+                         is done with it, so slow renders cannot pile up
+    """
+
+    def __init__(self, workers: int, concurrency: int, timeout: float):
+        self.workers = workers
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned workers start without the parent's state: they import
+            # app.utils.plot (with app.config) to unpickle the render function,
+            # but not the application itself
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=get_context("spawn"),
+                initializer=init_worker,
+            )
+        return self._pool
+
+    async def render(self, func: Callable[..., bytes], *args) -> bytes:
+        """
+        Run a rendering function in the pool
+
+        Args:
+            func (Callable): Module-level function returning the image bytes
+            *args: Picklable arguments of the function
+
+        Returns:
+            bytes: The rendered image
+
+        Raises:
+            TimeoutError: If the render did not finish within the timeout
+        """
+        loop = asyncio.get_running_loop()
+        async with asyncio.timeout(self.timeout):
+            await self._semaphore.acquire()
+            pool = self._get_pool()
+            try:
+                try:
+                    future = pool.submit(func, *args)
+                except BaseException:
+                    self._semaphore.release()
+                    raise
+                # Release the slot when the worker finishes, not when the caller
+                # stops waiting: cancelling the wait does not stop a running render
+                future.add_done_callback(partial(self._release, loop))
+                return await asyncio.wrap_future(future)
+            except BrokenProcessPool:
+                logger.exception("Plot rendering pool is broken, recreating it")
+                if self._pool is pool:
+                    self._pool = None
+                raise
+
+    def _release(self, loop: asyncio.AbstractEventLoop, _future: Future) -> None:
+        # Called from the executor's thread
+        with suppress(RuntimeError):  # The loop is already closed
+            loop.call_soon_threadsafe(self._semaphore.release)
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker processes
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+plot_renderer = PlotRenderer(
+    workers=get_settings().PLOT_RENDER_WORKERS,
+    concurrency=get_settings().PLOT_RENDER_CONCURRENCY,
+    timeout=get_settings().PLOT_RENDER_TIMEOUT,
+)
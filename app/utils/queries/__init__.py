@@ -1,18 +1,72 @@
-from app.utils.queries.setting import get_setting_by_key, save_multiple_settings
+from app.utils.queries.history import history_select, stream_history
+from app.utils.queries.partition import (
+    PARTITIONED_TABLES,
+    create_monthly_partitions,
+    is_partitioned,
+)
+from app.utils.queries.retention import (
+    delete_raw_batch,
+    delete_rollup_batch,
+    drop_expired_partitions,
+)
+from app.utils.queries.rollup import (
+    ROLLUP_RESOLUTIONS,
+    ROLLUPS,
+    choose_rollup_resolution,
+    compact_rollup_batch,
+    fetch_rollup_data,
+    get_rollup_watermarks,
+    stream_rollup_data,
+)
+from app.utils.queries.setting import (
+    SETTINGS_CHANNEL,
+    get_setting_by_key,
+    on_settings_notification,
+    save_multiple_settings,
+    settings_cache,
+)
 from app.utils.queries.weather import (
-    fetch_part_data,
+    LATEST_MODELS,
+    READINGS_CHANNEL,
+    LatestSnapshot,
     get_last_data,
     get_last_data_for_sensors,
     insert_sensor_data,
+    insert_sensor_data_bulk,
+    latest_readings,
+    reading_payload,
     save_external_weather,
 )
 
 __all__ = [
     "get_setting_by_key",
     "save_multiple_settings",
-    "fetch_part_data",
+    "settings_cache",
+    "SETTINGS_CHANNEL",
+    "on_settings_notification",
     "get_last_data",
     "get_last_data_for_sensors",
+    "LatestSnapshot",
+    "latest_readings",
+    "LATEST_MODELS",
+    "READINGS_CHANNEL",
+    "reading_payload",
     "insert_sensor_data",
+    "insert_sensor_data_bulk",
     "save_external_weather",
+    "PARTITIONED_TABLES",
+    "create_monthly_partitions",
+    "is_partitioned",
+    "ROLLUPS",
+    "ROLLUP_RESOLUTIONS",
+    "choose_rollup_resolution",
+    "compact_rollup_batch",
+    "fetch_rollup_data",
+    "get_rollup_watermarks",
+    "stream_rollup_data",
+    "delete_raw_batch",
+    "delete_rollup_batch",
+    "drop_expired_partitions",
+    "history_select",
+    "stream_history",
 ]
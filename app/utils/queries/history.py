@@ -0,0 +1,80 @@
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from sqlalchemy import Float, Numeric, Select, cast, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import DeclarativeMeta
+
+from app.utils.queries.rollup import ROLLUPS, rollup_select
+
+
+def history_select(
+    model: type[DeclarativeMeta],
+    start: datetime,
+    end: datetime,
+    resolution: int = 0,
+) -> Select:
+    """
+    Build a query of the stored history of a raw table ordered by time
+
+    NUMERIC columns are read as double precision, so the rows can be
+    encoded without converting every Decimal
+
+    Args:
+        model (Type[DeclarativeMeta]): The raw table model
+        start (datetime): The earliest reading (inclusive)
+        end (datetime): The latest reading (exclusive)
+        resolution (int): 0 for the raw rows, otherwise one of
+                          ROLLUP_RESOLUTIONS to read the aggregated data
+
+    Returns:
+        Select: Raw rows, or `created_at` (bucket start) and `<name>`,
+                `<name>_min`, `<name>_max` for every aggregated column
+    """
+    if resolution:
+        rollup, metrics = ROLLUPS[model]
+        source = (
+            rollup_select(
+                model, {name: getattr(model, name) for name in metrics}, resolution
+            )
+            .where(rollup.bucket >= start, rollup.bucket < end)
+            .subquery("history")
+        )
+        order_by = [source.c.created_at]
+    else:
+        source = model.__table__
+        order_by = [source.c.created_at, source.c.id]
+
+    columns = [
+        (
+            cast(column, Float).label(column.name)
+            if isinstance(column.type, Numeric)
+            else column
+        )
+        for column in source.c
+    ]
+    stmt = select(*columns).order_by(*order_by)
+    if not resolution:
+        stmt = stmt.where(source.c.created_at >= start, source.c.created_at < end)
+    return stmt
+
+
+async def stream_history(
+    session: AsyncSession, stmt: Select, chunk_size: int
+) -> AsyncIterator[list[Row]]:
+    """
+    Stream the rows of a `history_select` query in chunks through
+    a server-side cursor, so memory does not grow with the time range
+
+    Args:
+        session (AsyncSession): The database session
+        stmt (Select): Query built by `history_select`
+        chunk_size (int): Number of rows per chunk
+
+    Yields:
+        list[Row]: Rows ordered by time
+    """
+    result = await session.stream(stmt.execution_options(yield_per=chunk_size))
+    async for chunk in result.partitions():
+        yield chunk
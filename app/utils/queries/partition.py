@@ -0,0 +1,116 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Tables partitioned by month on created_at (see the d2a1180f25ef migration)
+PARTITIONED_TABLES = ("central", "outdoor", "external_weather")
+
+
+def month_start(moment: datetime, months: int = 0) -> datetime:
+    """
+    Get the first moment (UTC) of the month `months` away from the given one
+
+    Args:
+        moment (datetime): Any moment inside the base month
+        months (int): How many months to shift, may be negative
+
+    Returns:
+        datetime: Midnight of the first day of the resulting month
+    """
+    moment = moment.astimezone(UTC)
+    index = moment.year * 12 + moment.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=UTC)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+async def is_partitioned(session: AsyncSession, table: str) -> bool:
+    """
+    Check whether the table is a partitioned table
+
+    Args:
+        session (AsyncSession): The database session
+        table (str): Name of the table
+
+    Returns:
+        bool: True if the table is partitioned
+    """
+    result = await session.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :table)"
+        ),
+        {"table": table},
+    )
+    return bool(result.scalar())
+
+
+async def create_monthly_partitions(
+    session: AsyncSession,
+    table: str,
+    months_ahead: int,
+) -> list[str]:
+    """
+    Create monthly partitions from the current month up to `months_ahead`
+
+    A partition is built as a plain table, filled with the rows that already
+    landed in the default partition for its range and then attached, so stray
+    rows (e.g. from a station with a wrong clock) never block the creation
+
+    Args:
+        session (AsyncSession): The database session
+        table (str): Name of the partitioned table
+        months_ahead (int): How many future months should have a partition
+
+    Returns:
+        list[str]: Names of the created partitions
+    """
+    # Serialize maintenance between workers
+    await session.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:lock))"),
+        {"lock": f"partition-maintenance:{table}"},
+    )
+
+    result = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :table"
+        ),
+        {"table": table},
+    )
+    existing = set(result.scalars().all())
+
+    created = []
+    now = datetime.now(UTC)
+    for months in range(months_ahead + 1):
+        lower = month_start(now, months)
+        upper = month_start(now, months + 1)
+        name = partition_name(table, lower)
+        if name in existing:
+            continue
+
+        await session.execute(
+            text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)")
+        )
+        await session.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {table}_default "
+                f"WHERE created_at >= :lower AND created_at < :upper RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved"
+            ),
+            {"lower": lower, "upper": upper},
+        )
+        await session.execute(
+            text(
+                f"ALTER TABLE {table} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+        )
+        created.append(name)
+
+    await session.commit()
+    return created
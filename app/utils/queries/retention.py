@@ -0,0 +1,128 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import DeclarativeMeta
+
+from app.utils.queries.partition import month_start
+
+
+async def delete_raw_batch(
+    session: AsyncSession,
+    model: type[DeclarativeMeta],
+    cutoff: datetime,
+    max_id: int,
+    batch_size: int,
+) -> int:
+    """
+    Delete up to `batch_size` raw rows older than the cutoff in a short transaction
+
+    Only rows that are already aggregated into the rollups (id <= max_id)
+    are deleted
+
+    Args:
+        session (AsyncSession): The database session
+        model (Type[DeclarativeMeta]): The raw table model
+        cutoff (datetime): Rows created before this moment are expired
+        max_id (int): Highest id that may be deleted
+        batch_size (int): Maximum number of rows to delete
+
+    Returns:
+        int: Number of deleted rows
+    """
+    expired = (
+        select(model.id)
+        .where(model.created_at < cutoff, model.id <= max_id)
+        .limit(batch_size)
+    )
+    result = await session.execute(delete(model).where(model.id.in_(expired)))
+    await session.commit()
+    return result.rowcount
+
+
+async def delete_rollup_batch(
+    session: AsyncSession,
+    rollup: type[DeclarativeMeta],
+    resolution: int,
+    cutoff: datetime,
+    batch_size: int,
+) -> int:
+    """
+    Delete up to `batch_size` rollup buckets older than the cutoff
+    in a short transaction
+
+    Args:
+        session (AsyncSession): The database session
+        rollup (Type[DeclarativeMeta]): The rollup table model
+        resolution (int): Resolution of the buckets to delete
+        cutoff (datetime): Buckets started before this moment are expired
+        batch_size (int): Maximum number of buckets to delete
+
+    Returns:
+        int: Number of deleted buckets
+    """
+    expired = (
+        select(rollup.bucket)
+        .where(rollup.resolution == resolution, rollup.bucket < cutoff)
+        .limit(batch_size)
+    )
+    result = await session.execute(
+        delete(rollup).where(
+            rollup.resolution == resolution, rollup.bucket.in_(expired)
+        )
+    )
+    await session.commit()
+    return result.rowcount
+
+
+async def drop_expired_partitions(
+    session: AsyncSession,
+    table: str,
+    cutoff: datetime,
+    max_id: int,
+) -> list[str]:
+    """
+    Detach and drop monthly partitions that end before the cutoff and hold
+    only rows already aggregated into the rollups (id <= max_id)
+
+    Dropping a whole partition is instant and leaves no dead tuples to vacuum
+
+    Args:
+        session (AsyncSession): The database session
+        table (str): Name of the partitioned table
+        cutoff (datetime): Rows created before this moment are expired
+        max_id (int): Highest id that may be deleted
+
+    Returns:
+        list[str]: Names of the dropped partitions
+    """
+    result = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table AND c.relname ~ :pattern ORDER BY c.relname"
+        ),
+        {"table": table, "pattern": f"^{table}_y[0-9]{{4}}m[0-9]{{2}}$"},
+    )
+
+    dropped = []
+    for name in result.scalars().all():
+        year, month = int(name[-7:-3]), int(name[-2:])
+        upper = month_start(datetime(year, month, 1, tzinfo=UTC), 1)
+        if upper > cutoff:
+            break
+
+        newest_id = await session.scalar(text(f"SELECT max(id) FROM {name}"))
+        if newest_id is not None and newest_id > max_id:
+            break
+
+        # Detaching locks the parent table, fail fast instead of queueing inserts
+        await session.execute(text("SET LOCAL lock_timeout = '5s'"))
+        await session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        await session.execute(text(f"DROP TABLE {name}"))
+        await session.commit()
+        dropped.append(name)
+
+    await session.commit()
+    return dropped
@@ -0,0 +1,280 @@
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
+
+from sqlalchemy import BigInteger, Select, Text, cast, func, literal, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import DeclarativeMeta, InstrumentedAttribute
+
+from app.db.models import (
+    Central,
+    CentralRollup,
+    ExternalWeather,
+    ExternalWeatherRollup,
+    Outdoor,
+    OutdoorRollup,
+    RollupWatermark,
+)
+from app.utils.queries.weather import time_bucket
+
+# Bucket widths in seconds, from the finest to the coarsest
+ROLLUP_RESOLUTIONS = (60, 600, 3600)
+
+# Raw model -> (rollup model, aggregated columns)
+ROLLUPS = {
+    Central: (CentralRollup, ("temperature", "humidity", "pressure", "co2", "tvoc")),
+    Outdoor: (OutdoorRollup, ("temperature", "humidity", "pressure")),
+    ExternalWeather: (
+        ExternalWeatherRollup,
+        ("temperature_feels_like", "precipitation", "uv_index", "wind_speed"),
+    ),
+}
+
+
+def choose_rollup_resolution(window: timedelta, max_points: int) -> int:
+    """
+    Pick the finest rollup resolution that covers the window
+    with at most `max_points` buckets
+
+    Args:
+        window (timedelta): Requested time range
+        max_points (int): Maximum number of buckets to read
+
+    Returns:
+        int: Bucket width in seconds
+    """
+    for resolution in ROLLUP_RESOLUTIONS:
+        if window.total_seconds() / resolution <= max_points:
+            return resolution
+    return ROLLUP_RESOLUTIONS[-1]
+
+
+async def aggregate_rows(
+    session: AsyncSession,
+    model: type[DeclarativeMeta],
+    lower_id: int,
+    upper_id: int,
+) -> None:
+    """
+    Merge raw rows with lower_id < id <= upper_id into the rollups of every
+    resolution. Existing buckets are combined with the new rows, so rows that
+    arrive late (e.g. bulk uploads with old timestamps) are accounted for too
+
+    Args:
+        session (AsyncSession): The database session
+        model (Type[DeclarativeMeta]): The raw table model
+        lower_id (int): Exclusive lower bound of the id range
+        upper_id (int): Inclusive upper bound of the id range
+    """
+    rollup, metrics = ROLLUPS[model]
+
+    for resolution in ROLLUP_RESOLUTIONS:
+        bucket = time_bucket(model.created_at, resolution)
+        names = ["resolution", "bucket", "samples"]
+        columns = [literal(resolution), bucket, func.count()]
+        for metric in metrics:
+            column = getattr(model, metric)
+            names += [f"{metric}_sum", f"{metric}_min", f"{metric}_max"]
+            columns += [func.sum(column), func.min(column), func.max(column)]
+
+        source = (
+            select(*columns)
+            .where(model.id > lower_id, model.id <= upper_id)
+            .group_by(bucket)
+        )
+        stmt = insert(rollup).from_select(names, source)
+
+        merged = {"samples": rollup.samples + stmt.excluded.samples}
+        for metric in metrics:
+            total, low, high = f"{metric}_sum", f"{metric}_min", f"{metric}_max"
+            merged[total] = getattr(rollup, total) + stmt.excluded[total]
+            merged[low] = func.least(getattr(rollup, low), stmt.excluded[low])
+            merged[high] = func.greatest(getattr(rollup, high), stmt.excluded[high])
+
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[rollup.resolution, rollup.bucket],
+                set_=merged,
+            )
+        )
+
+
+def snapshot_xid(name: str):
+    """
+    SQL expression of a bound of the current snapshot as bigint
+
+    Args:
+        name (str): "xmin" (oldest transaction still running)
+                    or "xmax" (first transaction not yet started)
+    """
+    bound = getattr(func, f"pg_snapshot_{name}")(func.pg_current_snapshot())
+    return cast(cast(bound, Text), BigInteger)
+
+
+async def compact_rollup_batch(
+    session: AsyncSession,
+    model: type[DeclarativeMeta],
+    batch_size: int,
+) -> bool:
+    """
+    Run one step of the rollup compactor for a raw table in its own transaction
+
+    Either aggregates up to `batch_size` ids after the watermark, or, when the
+    watermark has caught up, remembers the current max id to process next time.
+    Ids are aggregated only after every transaction that was running when the
+    max id was read has ended, so rows committed late are not skipped
+
+    Args:
+        session (AsyncSession): The database session
+        model (Type[DeclarativeMeta]): The raw table model
+        batch_size (int): Maximum number of ids to aggregate at once
+
+    Returns:
+        bool: True if there are more rows to aggregate right away
+    """
+    table = model.__tablename__
+
+    # Serialize compaction between workers
+    await session.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:lock))"),
+        {"lock": f"rollup-compactor:{table}"},
+    )
+    await session.execute(
+        insert(RollupWatermark)
+        .values(table_name=table, last_id=0, next_id=0)
+        .on_conflict_do_nothing()
+    )
+    result = await session.execute(
+        select(RollupWatermark)
+        .where(RollupWatermark.table_name == table)
+        .execution_options(populate_existing=True)
+    )
+    watermark = result.scalars().one()
+
+    if watermark.last_id >= watermark.next_id:
+        # One statement, so the max id and xmax come from the same snapshot
+        result = await session.execute(
+            select(
+                func.coalesce(func.max(model.id), watermark.last_id),
+                snapshot_xid("xmax"),
+            )
+        )
+        watermark.next_id, watermark.next_xid = result.one()
+        await session.commit()
+        return False
+
+    if await session.scalar(select(snapshot_xid("xmin"))) < watermark.next_xid:
+        # A writer that may hold an id below next_id has not ended yet
+        await session.commit()
+        return False
+
+    upper_id = min(watermark.next_id, watermark.last_id + batch_size)
+    await aggregate_rows(session, model, watermark.last_id, upper_id)
+    watermark.last_id = upper_id
+    await session.commit()
+    return upper_id < watermark.next_id
+
+
+async def get_rollup_watermarks(session: AsyncSession) -> dict[str, int]:
+    """
+    Get the highest aggregated id of every raw table
+
+    Args:
+        session (AsyncSession): The database session
+
+    Returns:
+        dict[str, int]: Table name -> last aggregated id
+    """
+    result = await session.execute(
+        select(RollupWatermark.table_name, RollupWatermark.last_id)
+    )
+    return dict(result.all())
+
+
+def rollup_select(
+    model: type[DeclarativeMeta],
+    columns: dict[str, InstrumentedAttribute],
+    resolution: int,
+) -> Select:
+    """
+    Build a query of the aggregated data of a raw table ordered by time
+
+    Args:
+        model (Type[DeclarativeMeta]): The raw table model
+        columns (dict[str, InstrumentedAttribute]): Output name -> raw column
+        resolution (int): Bucket width in seconds, one of ROLLUP_RESOLUTIONS
+
+    Returns:
+        Select: Query with `created_at` (bucket start) and `<name>`,
+                `<name>_min`, `<name>_max` for every column
+    """
+    rollup, _ = ROLLUPS[model]
+
+    selected = [rollup.bucket.label("created_at")]
+    for name, column in columns.items():
+        selected += [
+            (getattr(rollup, f"{column.key}_sum") / rollup.samples).label(name),
+            getattr(rollup, f"{column.key}_min").label(f"{name}_min"),
+            getattr(rollup, f"{column.key}_max").label(f"{name}_max"),
+        ]
+
+    return (
+        select(*selected).where(rollup.resolution == resolution).order_by(rollup.bucket)
+    )
+
+
+async def fetch_rollup_data(
+    session: AsyncSession,
+    model: type[DeclarativeMeta],
+    columns: dict[str, InstrumentedAttribute],
+    time_threshold: datetime,
+    resolution: int,
+) -> list[Row]:
+    """
+    Fetch aggregated data of a raw table from its rollup
+
+    Args:
+        session (AsyncSession): The database session
+        model (Type[DeclarativeMeta]): The raw table model
+        columns (dict[str, InstrumentedAttribute]): Output name -> raw column
+        time_threshold (datetime): The minimum bucket start
+        resolution (int): Bucket width in seconds, one of ROLLUP_RESOLUTIONS
+
+    Returns:
+        list[Row]: Rows ordered by time with `created_at` (bucket start)
+                   and `<name>`, `<name>_min`, `<name>_max` for every column
+    """
+    rollup, _ = ROLLUPS[model]
+    stmt = rollup_select(model, columns, resolution).where(
+        rollup.bucket >= time_threshold
+    )
+    result = await session.execute(stmt)
+    return result.all()
+
+
+async def stream_rollup_data(
+    session: AsyncSession,
+    model: type[DeclarativeMeta],
+    columns: dict[str, InstrumentedAttribute],
+    resolution: int,
+    chunk_size: int,
+) -> AsyncIterator[list[Row]]:
+    """
+    Stream the whole aggregated history of a raw table in chunks
+    through a server-side cursor, so memory does not grow with the history
+
+    Args:
+        session (AsyncSession): The database session
+        model (Type[DeclarativeMeta]): The raw table model
+        columns (dict[str, InstrumentedAttribute]): Output name -> raw column
+        resolution (int): Bucket width in seconds, one of ROLLUP_RESOLUTIONS
+        chunk_size (int): Number of rows per chunk
+
+    Yields:
+        list[Row]: Rows ordered by time, as returned by `fetch_rollup_data`
+    """
+    stmt = rollup_select(model, columns, resolution)
+    result = await session.stream(stmt.execution_options(yield_per=chunk_size))
+    async for chunk in result.partitions():
+        yield chunk
@@ -1,18 +1,148 @@
-from async_lru import alru_cache
-from sqlalchemy import select
+import asyncio
+import time
+
+from logging import getLogger
+
+from sqlalchemy import String, column, func, select, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.db.models import Setting
 from app.schemas import SettingPatchWithKey
 
+logger = getLogger(__name__)
+
+
+def convert_setting_value(value: str, type_: str) -> int | float | str | bool:
+    """
+    Convert a stored setting value to its declared type
+
+    Args:
+        value (str): The stored value
+        type_ (str): The declared type (int, float, bool or str)
+
+    Returns:
+        The value converted to its type
+    """
+    if type_ == "int":
+        return int(value)
+    elif type_ == "float":
+        return float(value)
+    elif type_ == "bool":
+        return value.lower() in ("true", "1", "yes")
+    else:  # Default to string
+        return value
+
+
+# Accepted spellings of boolean setting values
+BOOL_VALUES = ("true", "false", "1", "0", "yes", "no")
+
+
+class SettingsCache:
+    """
+    Process-wide cache of all settings
+
+    The whole table is loaded with one query and kept for `ttl` seconds.
+    Changes made through `save_multiple_settings` are announced on
+    SETTINGS_CHANNEL, and every worker listening to it invalidates its cache
+    at once, so the TTL only matters if notifications are missed
+
+    Args:
+        ttl (float): Seconds the loaded settings are used
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._values: dict[str, int | float | str | bool] | None = None
+        self._types: dict[str, str] = {}
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return (
+            self._values is not None and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+    async def _load(self, session: AsyncSession) -> tuple[dict, dict[str, str]]:
+        if self._fresh():
+            return self._values, self._types
+
+        async with self._lock:
+            if self._fresh():
+                return self._values, self._types
+
+            generation = self._generation
+            result = await session.execute(
+                select(Setting.key, Setting.value, Setting.type)
+            )
+            values, types = {}, {}
+            for key, value, type_ in result.all():
+                types[key] = type_
+                try:
+                    values[key] = convert_setting_value(value, type_)
+                except ValueError:
+                    # One broken row must not make every other setting unreadable
+                    logger.error(
+                        "Setting %s is skipped, %r is not a valid %s", key, value, type_
+                    )
+            # Do not keep what was read before a concurrent invalidation
+            if generation == self._generation:
+                self._values, self._types = values, types
+                self._loaded_at = time.monotonic()
+            return values, types
+
+    async def get_all(self, session: AsyncSession) -> dict:
+        """
+        Get all settings converted to their types, loading them if needed
+
+        Args:
+            session (AsyncSession): The database session used to load them
+
+        Returns:
+            dict: Setting key -> value
+        """
+        values, _ = await self._load(session)
+        return values
+
+    async def get_types(self, session: AsyncSession) -> dict[str, str]:
+        """
+        Get the declared types of all settings, loading them if needed
+
+        Args:
+            session (AsyncSession): The database session used to load them
+
+        Returns:
+            dict[str, str]: Setting key -> type
+        """
+        _, types = await self._load(session)
+        return types
+
+    def invalidate(self) -> None:
+        self._values = None
+        self._generation += 1
+
+
+settings_cache = SettingsCache(ttl=get_settings().SETTINGS_CACHE_TTL)
+
+# Postgres notification channel announcing settings changes
+SETTINGS_CHANNEL = "settings_changed"
+
+
+def on_settings_notification(payload: str | None) -> None:
+    """
+    Invalidate the settings cache when any worker changed the settings
+    (or the listener reconnected and may have missed a change)
+    """
+    settings_cache.invalidate()
+
 
-@alru_cache(maxsize=128)
 async def get_setting_by_key(
     session: AsyncSession, key: str
 ) -> int | float | str | bool:
     """
     Get a setting value by its key and convert it to the specified type
-    This function caches the result for faster access in the future
+    Values come from the process-wide settings cache
 
     Args:
         session (AsyncSession): The database session
@@ -21,42 +151,113 @@ async def get_setting_by_key(
     Returns:
         The value of the setting converted to its type if found, otherwise None
     """
-    result = await session.execute(select(Setting).where(Setting.key == key))
-    setting = result.scalars().first()
+    values = await settings_cache.get_all(session)
+    return values.get(key)
 
-    if not setting:
-        return None
 
-    # Convert the value to the specified type
-    if setting.type == "int":
-        return int(setting.value)
-    elif setting.type == "float":
-        return float(setting.value)
-    elif setting.type == "bool":
-        return setting.value.lower() in ("true", "1", "yes")
-    else:  # Default to string
-        return setting.value
+def validate_setting_value(key: str, value: str, type_: str) -> None:
+    """
+    Check that a setting value can be read as its declared type
+
+    Args:
+        key (str): The setting key, for the error message
+        value (str): The value to save
+        type_ (str): The declared type (int, float, bool or str)
+
+    Raises:
+        ValueError: If the value does not match the type
+    """
+    if type_ == "bool":
+        valid = value.lower() in BOOL_VALUES
+    elif type_ in ("int", "float"):
+        try:
+            convert_setting_value(value, type_)
+            valid = True
+        except ValueError:
+            valid = False
+    else:
+        valid = True
+
+    if not valid:
+        raise ValueError(f"Invalid {type_} value for setting {key}: {value!r}")
 
 
 async def save_multiple_settings(
     session: AsyncSession,
     payload: list[SettingPatchWithKey],
-) -> None:
+) -> list[str]:
     """
-    Save multiple settings to the database
+    Save multiple settings to the database with a single UPDATE
+
+    Values are validated against the new type if it is given, otherwise
+    against the stored one. A new type without a value is validated against
+    the stored value. Unknown keys are skipped, a missing value or type keeps
+    the stored one
 
     Args:
         session (AsyncSession): The database session
         payload (List[SettingPatchWithKey]): List of settings to save
+
+    Returns:
+        list[str]: Keys of the updated settings
+
+    Raises:
+        ValueError: If a value does not match its type
     """
-    for item in payload:
-        result = await session.execute(select(Setting).where(Setting.key == item.key))
-        setting = result.scalars().first()
-        if not setting:
-            continue
-        for field, value in item.model_dump(exclude_unset=True).items():
-            if field != "key":
-                setattr(setting, field, value)
+    # The last item wins if a key is sent twice
+    items = {item.key: item for item in payload}
+    if not items:
+        return []
+
+    types = await settings_cache.get_types(session)
+    retyped = [
+        key
+        for key, item in items.items()
+        if item.value is None and item.type is not None
+    ]
+    stored = {}
+    if retyped:
+        # Locked, so the values cannot change before the UPDATE below
+        result = await session.execute(
+            select(Setting.key, Setting.value)
+            .where(Setting.key.in_(retyped))
+            .with_for_update()
+        )
+        stored = dict(result.all())
+
+    rows = []
+    for key, item in items.items():
+        type_ = item.type.value if item.type is not None else types.get(key)
+        value = item.value if item.value is not None else stored.get(key)
+        if value is not None and type_ is not None:
+            validate_setting_value(key, value, type_)
+        rows.append((key, item.value, item.type.value if item.type else None))
 
+    changes = values(
+        column("key", String),
+        column("value", String),
+        column("type", String),
+        name="changes",
+    ).data(rows)
+    updated = (
+        update(Setting)
+        .where(Setting.key == changes.c.key)
+        .values(
+            value=func.coalesce(changes.c.value, Setting.value),
+            type=func.coalesce(changes.c.type, Setting.type),
+        )
+        .returning(Setting.key)
+        .cte("updated")
+    )
+    # Notify in the same statement, delivered to the listeners on commit
+    result = await session.execute(
+        select(
+            func.array_agg(updated.c.key),
+            func.pg_notify(SETTINGS_CHANNEL, ""),
+        ).having(func.count() > 0)
+    )
+    keys = result.scalar() or []
     await session.commit()
-    get_setting_by_key.cache_clear()
+    if keys:
+        settings_cache.invalidate()
+    return keys
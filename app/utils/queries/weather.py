@@ -1,33 +1,46 @@
-from datetime import datetime
+import asyncio
+import json
+import time
+
+from datetime import UTC, datetime
+from decimal import Decimal
 from typing import Any
 
-from sqlalchemy import desc, select
+from sqlalchemy import ARRAY, String, desc, func, insert, literal, select, true
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import DeclarativeMeta
+from sqlalchemy.orm import DeclarativeMeta, InstrumentedAttribute, aliased
 
+from app.config import get_settings
 from app.db.models import Central, ExternalWeather, Outdoor
-from app.schemas import WeatherUploadRequest
+from app.schemas import WeatherBulkReading, WeatherUploadRequest
 
+# Tables whose latest rows make up the current weather
+LATEST_MODELS = {
+    model.__tablename__: model for model in (Central, Outdoor, ExternalWeather)
+}
+LATEST_TABLES = tuple(LATEST_MODELS)
 
-async def fetch_part_data(
-    session: AsyncSession,
-    model: type[DeclarativeMeta],
-    time_threshold: datetime,
-) -> list[DeclarativeMeta]:
+# Postgres notification channel announcing newly written readings
+READINGS_CHANNEL = "readings"
+
+# Rows per multi-row INSERT: keeps the statement well below the limit
+# of 32767 bind parameters per query in PostgreSQL
+BULK_INSERT_CHUNK_SIZE = 1000
+
+
+def time_bucket(column: InstrumentedAttribute, seconds: int):
     """
-    Fetch rows from a given model where created_at >= time_threshold.
+    SQL expression that floors a timestamp to the start of its bucket
 
-    Args:
-        session (AsyncSession): The database session
-        model (Type[DeclarativeMeta]): The SQLAlchemy model representing the table
-        time_threshold (datetime): The minimum timestamp for filtering records
+    Works like `date_bin` (which needs PostgreSQL 14+) for buckets
+    of a whole number of seconds aligned to the Unix epoch
 
-    Returns:
-        list: List of model instances
+    Args:
+        column (InstrumentedAttribute): Timestamp column
+        seconds (int): Bucket width in seconds
     """
-    stmt = select(model).where(model.created_at >= time_threshold)
-    result = await session.execute(stmt)
-    return result.scalars().all()
+    epoch = func.extract("epoch", column)
+    return func.to_timestamp(func.floor(epoch / seconds) * seconds)
 
 
 async def get_last_data(
@@ -52,7 +65,12 @@ async def get_last_data_for_sensors(
     session: AsyncSession,
 ) -> dict[Any, DeclarativeMeta]:
     """
-    Fetch the last row for each model in the predefined list of models.
+    Fetch the last row for each model in the predefined list of models
+    with a single query (one round trip)
+
+    Every latest row is an uncorrelated `ORDER BY id DESC LIMIT 1` subquery
+    (a backward scan of the primary key), LEFT JOINed to a one-row anchor,
+    so an empty table gives None instead of no result
 
     Args:
         session (AsyncSession): The database session.
@@ -61,11 +79,163 @@ async def get_last_data_for_sensors(
         dict[str, list]: A dictionary where keys are table names and values
                          are the last rows of the respective tables
     """
-    result = {}
     models = [Central, Outdoor, ExternalWeather]
+    anchor = select(literal(1).label("anchor")).subquery("anchor")
+    stmt = select().select_from(anchor)
+    entities = []
     for model in models:
-        result[model.__tablename__] = await get_last_data(session, model)
-    return result
+        last = (
+            select(model)
+            .order_by(desc(model.id))
+            .limit(1)
+            .subquery(f"last_{model.__tablename__}")
+        )
+        entities.append(aliased(model, last))
+        stmt = stmt.outerjoin(last, true())
+
+    result = await session.execute(stmt.add_columns(*entities))
+    row = result.one()
+    return {
+        model.__tablename__: instance
+        for model, instance in zip(models, row, strict=True)
+    }
+
+
+class LatestSnapshot:
+    """
+    Immutable set of the latest Central, Outdoor and ExternalWeather rows
+
+    The ETag is built from the row ids, so every worker serving the same
+    rows returns the same ETag. The last modification time is when the rows
+    were first seen: created_at does not fit, bulk uploads carry device
+    timestamps that can be older than the rows they replace
+    """
+
+    def __init__(self, rows: dict[str, Any]):
+        self.rows = rows
+        ids = (getattr(rows.get(table), "id", 0) for table in LATEST_TABLES)
+        self.etag = '"{}"'.format("-".join(map(str, ids)))
+        self.last_modified = datetime.now(UTC)
+
+    def __getitem__(self, table: str) -> Any:
+        return self.rows[table]
+
+
+class LatestReadings:
+    """
+    Process-wide write-through snapshot of the latest sensor rows
+
+    The insert queries below update it with the rows they wrote (only ever
+    moving to a higher id), and rows written by other workers arrive with
+    their READINGS_CHANNEL notification. The database is read only on a cold
+    start and once the snapshot is older than `ttl` seconds, in case
+    notifications were missed
+
+    Args:
+        ttl (float): Seconds the snapshot is used without a database read
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._snapshot: LatestSnapshot | None = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return (
+            self._snapshot is not None and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+    async def get(self, session: AsyncSession) -> LatestSnapshot:
+        """
+        Get the latest rows, reading them from the database if needed
+
+        Args:
+            session (AsyncSession): The database session used to read them
+
+        Returns:
+            LatestSnapshot: The latest row of every table
+        """
+        if self._fresh():
+            return self._snapshot
+
+        async with self._lock:
+            if self._fresh():
+                return self._snapshot
+
+            rows = await get_last_data_for_sensors(session)
+            self._loaded_at = time.monotonic()
+            # Rows written while the query was running are kept
+            self._merge(rows)
+            return self._snapshot
+
+    def update(self, **rows: Any) -> None:
+        """
+        Replace the latest rows of the given tables with just inserted ones
+        (no-op until the snapshot is loaded)
+
+        Args:
+            **rows: Table name -> inserted row with all its columns
+        """
+        if self._snapshot is not None:
+            self._merge(rows)
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+
+    def _merge(self, rows: dict[str, Any]) -> None:
+        merged = dict(self._snapshot.rows) if self._snapshot is not None else {}
+        changed = self._snapshot is None
+        for table, row in rows.items():
+            old = merged.get(table)
+            if old is None or (row is not None and row.id > old.id):
+                changed = changed or row is not old
+                merged[table] = row
+        if changed:
+            self._snapshot = LatestSnapshot(merged)
+
+
+latest_readings = LatestReadings(ttl=get_settings().LATEST_READINGS_TTL)
+
+
+def reading_payload(table: str, row: Any) -> dict:
+    """
+    Convert a row of one of LATEST_TABLES to JSON-compatible values
+
+    Args:
+        table (str): The table name
+        row (Any): Model instance or a row with all its columns
+
+    Returns:
+        dict: Column name -> value
+    """
+    payload = {}
+    for column in LATEST_MODELS[table].__table__.columns:
+        value = getattr(row, column.name)
+        if isinstance(value, Decimal):
+            value = float(value)
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        payload[column.name] = value
+    return payload
+
+
+async def notify_readings(session: AsyncSession, events: list[dict[str, Any]]) -> None:
+    """
+    Announce the written rows on READINGS_CHANNEL to every worker with one
+    notification per event, so a payload never gets near the 8000 byte limit
+    of NOTIFY. Notifications are delivered only when the transaction commits
+
+    Args:
+        session (AsyncSession): The session of the writing transaction
+        events (list[dict[str, Any]]): Table name -> written row, per event
+    """
+    payloads = [
+        json.dumps({table: reading_payload(table, row) for table, row in rows.items()})
+        for rows in events
+    ]
+    payload = func.unnest(literal(payloads, ARRAY(String))).column_valued("payload")
+    await session.execute(select(func.pg_notify(READINGS_CHANNEL, payload)))
 
 
 async def insert_sensor_data(
@@ -79,9 +249,69 @@ async def insert_sensor_data(
         session (AsyncSession): Active DB session
         payload (WeatherUploadRequest): The payload containing sensor data
     """
-    session.add(Central(**payload.central.model_dump()))
-    session.add(Outdoor(**payload.outdoor.model_dump()))
+    central = await session.execute(
+        insert(Central)
+        .values(**payload.central.model_dump())
+        .returning(*Central.__table__.columns)
+    )
+    outdoor = await session.execute(
+        insert(Outdoor)
+        .values(**payload.outdoor.model_dump())
+        .returning(*Outdoor.__table__.columns)
+    )
+    rows = {"central": central.one(), "outdoor": outdoor.one()}
+    await notify_readings(session, [rows])
+    await session.commit()
+    latest_readings.update(**rows)
+
+
+async def insert_sensor_data_bulk(
+    session: AsyncSession,
+    readings: list[WeatherBulkReading],
+) -> None:
+    """
+    Insert a batch of sensor readings with device-side timestamps
+    using multi-row INSERT statements and a single commit
+
+    Args:
+        session (AsyncSession): Active DB session
+        readings (list[WeatherBulkReading]): Readings buffered by the station
+    """
+    central_rows = [
+        {**reading.central.model_dump(), "created_at": reading.created_at}
+        for reading in readings
+    ]
+    outdoor_rows = [
+        {**reading.outdoor.model_dump(), "created_at": reading.created_at}
+        for reading in readings
+    ]
+
+    written = {}
+    for model, rows in ((Central, central_rows), (Outdoor, outdoor_rows)):
+        inserted = []
+        for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+            chunk = rows[start : start + BULK_INSERT_CHUNK_SIZE]
+            stmt = insert(model).values(chunk).returning(*model.__table__.columns)
+            inserted += (await session.execute(stmt)).all()
+        # Same order in both tables, so the rows of a reading line up
+        inserted.sort(key=lambda row: (row.created_at, row.id))
+        written[model.__tablename__] = inserted
+
+    # Every reading is announced, like a single upload
+    events = [
+        dict(zip(written, rows, strict=True))
+        for rows in zip(*written.values(), strict=True)
+    ]
+    if events:
+        await notify_readings(session, events)
     await session.commit()
+    latest_readings.update(
+        **{
+            table: max(rows, key=lambda row: row.id)
+            for table, rows in written.items()
+            if rows
+        }
+    )
 
 
 async def save_external_weather(session: AsyncSession, weather_data: dict) -> None:
@@ -92,6 +322,12 @@ async def save_external_weather(session: AsyncSession, weather_data: dict) -> No
         session (AsyncSession): The database session
         weather_data (Dict): The weather data to save
     """
-    weather_entry = ExternalWeather(**weather_data)
-    session.add(weather_entry)
+    result = await session.execute(
+        insert(ExternalWeather)
+        .values(**weather_data)
+        .returning(*ExternalWeather.__table__.columns)
+    )
+    rows = {"external_weather": result.one()}
+    await notify_readings(session, [rows])
     await session.commit()
+    latest_readings.update(**rows)
@@ -1,19 +1,34 @@
 import json
-import tempfile
 
-from aiogram import F, Router, types
+from collections.abc import AsyncGenerator
+
+from aiogram import Bot, F, Router, types
 from aiogram.filters import Command
-from aiogram.types import FSInputFile
+from aiogram.types import BufferedInputFile, InputFile
 
 from app.db.connection import session_context
 from app.schemas import SettingPatchWithKey
-from app.utils.common import create_postgres_backup
-from app.utils.queries import get_last_data_for_sensors, save_multiple_settings
+from app.utils.common import PostgresBackup, create_postgres_backup
+from app.utils.queries import latest_readings, save_multiple_settings
 from app.utils.weather_predict import get_data_weather_prediction
 
 router = Router()
 
 
+class BackupInputFile(InputFile):
+    """
+    Upload a running backup to Telegram as pg_dump produces it
+    """
+
+    def __init__(self, backup: PostgresBackup):
+        super().__init__(filename=backup.filename)
+        self.backup = backup
+
+    async def read(self, bot: Bot) -> AsyncGenerator[bytes, None]:
+        async for chunk in self.backup.stream():
+            yield chunk
+
+
 @router.message(Command("start"))
 async def start_handler(message: types.Message):
     """Send welcome message and list of available commands"""
@@ -40,7 +55,8 @@ async def help_handler(message: types.Message):
         "/weather - Получить текущую погоду\n"
         "/predict - Получить прогноз температуры и осадков\n"
         "/plot [n] - Построить график данных за n часов (по умолчанию 6)\n"
-        "/backup - Скачать резервную копию настроек\n"
+        "/backup [plain|custom] [none|gzip|zstd] - Скачать резервную копию базы "
+        "(по умолчанию plain gzip)\n"
         "/settings <json> - Обновить несколько настроек\n\n"
         "Доступные ключи настроек:\n"
         "- latitude (float)\n"
@@ -49,7 +65,11 @@ async def help_handler(message: types.Message):
         "- co2_alert_threshold (int)\n"
         "- tvoc_alert_threshold (int)\n"
         "- telegram_bot_token (str)\n"
-        "- telegram_webhook_url (str)\n\n"
+        "- telegram_webhook_url (str)\n"
+        "- retention_raw_days (int, 0 - хранить всегда)\n"
+        "- retention_rollup_60_days (int)\n"
+        "- retention_rollup_600_days (int)\n"
+        "- retention_rollup_3600_days (int)\n\n"
         "Пример:\n"
         '/settings [{"key": "sensor_poll_interval_ms", "value": "60000", '
         '"type": "int"}]',
@@ -62,7 +82,7 @@ async def weather_handler(message: types.Message):
     await message.answer("Получаю текущую погоду... ⌛")
 
     async with session_context() as session:
-        weather = await get_last_data_for_sensors(session)
+        weather = await latest_readings.get(session)
 
     text = (
         "<b>🌡 Центральные датчики:</b>\n"
@@ -123,34 +143,37 @@ async def plot_handler(message: types.Message):
         async with session_context() as session:
             from app.utils.common import generate_weather_plot
 
-            response = await generate_weather_plot(session, hours)
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-            async for chunk in response.body_iterator:
-                tmp.write(chunk)
-            tmp.close()
+            png = await generate_weather_plot(session, hours)
 
         await message.answer_photo(
-            photo=FSInputFile(tmp.name), caption=f"📈 График за последние {hours} ч."
+            photo=BufferedInputFile(png, filename="plot.png"),
+            caption=f"📈 График за последние {hours} ч.",
         )
 
+    except TimeoutError:
+        await message.answer("⏳ Сервер перегружен, попробуй построить график позже")
     except Exception as e:
         await message.answer(f"❌ Не удалось построить график: {e}")
 
 
 @router.message(Command("backup"))
 async def backup_handler(message: types.Message):
-    """Create and send system settings backup"""
+    """Create and send a database backup"""
+    args = message.text.strip().split()
     await message.answer("Создаю резервную копию... 📁")
 
+    backup = None
     try:
-        file_response = await create_postgres_backup()
-        file_path = file_response.path
-
+        backup = await create_postgres_backup(*args[1:3])
         await message.answer_document(
-            document=FSInputFile(file_path), caption="📄 Резервная копия базы данных"
+            document=BackupInputFile(backup),
+            caption="📄 Резервная копия базы данных",
         )
     except Exception as e:
         await message.answer(f"❌ Ошибка при создании резервной копии: {e}")
+    finally:
+        if backup is not None:
+            await backup.close()
 
 
 @router.message(Command("settings"))
@@ -1,5 +1,42 @@
-from app.utils.weather_predict.predict import get_data_weather_prediction
+from app.utils.weather_predict.cache import PredictionCache, prediction_cache
+from app.utils.weather_predict.features import (
+    FEATURE_COLUMNS,
+    LAG_FEATURES,
+    LAGGED_FEATURE_COLUMNS,
+    PREDICTION_HORIZON,
+    build_features,
+    hourly_frame,
+)
+from app.utils.weather_predict.inference import (
+    InferenceBatcher,
+    inference_batcher,
+    predict_batch,
+)
+from app.utils.weather_predict.predict import (
+    get_data_weather_prediction,
+    get_data_weather_prediction_range,
+)
+from app.utils.weather_predict.registry import (
+    LoadedModel,
+    ModelRegistry,
+    model_registry,
+)
 
 __all__ = [
     "get_data_weather_prediction",
+    "get_data_weather_prediction_range",
+    "FEATURE_COLUMNS",
+    "LAG_FEATURES",
+    "LAGGED_FEATURE_COLUMNS",
+    "PREDICTION_HORIZON",
+    "build_features",
+    "hourly_frame",
+    "predict_batch",
+    "InferenceBatcher",
+    "inference_batcher",
+    "PredictionCache",
+    "prediction_cache",
+    "LoadedModel",
+    "ModelRegistry",
+    "model_registry",
 ]
@@ -0,0 +1,61 @@
+import time
+
+from collections.abc import Hashable
+
+from app.config import get_settings
+
+
+class PredictionCache:
+    """
+    Holds the last prediction keyed by the latest Central row id and the
+    model version
+
+    A result is served without any lookup while it is fresh: until a reading
+    is ingested by this process (`invalidate`) or `ttl` seconds pass, which
+    bounds the staleness caused by readings ingested by other workers. After
+    that the caller looks up the latest row and compares the key
+
+    Args:
+        ttl (float): Seconds a result is trusted without checking the key
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._key: Hashable | None = None
+        self._result: dict | None = None
+        self._checked_at = float("-inf")
+
+    def get_fresh(self, model_version: Hashable) -> dict | None:
+        """
+        Get the cached result if it is still fresh and made by the given model
+        """
+        if (
+            self._result is None
+            or time.monotonic() - self._checked_at >= self.ttl
+            or self._key[1] != model_version
+        ):
+            return None
+        return self._result
+
+    def get(self, key: Hashable) -> dict | None:
+        """
+        Get the cached result for the key and mark it fresh again
+        """
+        if self._result is None or self._key != key:
+            return None
+        self._checked_at = time.monotonic()
+        return self._result
+
+    def put(self, key: Hashable, result: dict) -> None:
+        self._key = key
+        self._result = result
+        self._checked_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """
+        Force a lookup of the latest reading on the next request
+        """
+        self._checked_at = float("-inf")
+
+
+prediction_cache = PredictionCache(ttl=get_settings().PREDICTION_CACHE_TTL)
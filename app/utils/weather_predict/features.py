@@ -0,0 +1,110 @@
+from collections.abc import Sequence
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from sqlalchemy.engine import Row
+
+# Model input columns of the original model, in the order the scaler was fitted with
+FEATURE_COLUMNS = [
+    "Temperature",
+    "Humidity",
+    "Pressure (mmHg)",
+    "Month",
+    "Hour",
+    "DayOfMonth",
+]
+
+# The original model predicts the weather this far ahead of the readings
+PREDICTION_HORIZON = timedelta(hours=6)
+
+# Readings that are also fed to the model as they were some hours earlier
+LAGGED_COLUMNS = ("Temperature", "Pressure (mmHg)")
+LAG_HOURS = (1, 3, 6)
+
+
+def lag_column(column: str, hours: int) -> str:
+    return f"{column} {hours}h ago"
+
+
+LAG_FEATURES = [lag_column(c, h) for c in LAGGED_COLUMNS for h in LAG_HOURS]
+
+# Columns of a model trained by `python -m app.train`
+LAGGED_FEATURE_COLUMNS = FEATURE_COLUMNS + LAG_FEATURES
+
+
+def uses_history(columns: Sequence[str]) -> bool:
+    """
+    Check whether the feature columns need the hourly history of readings
+    """
+    return any(column in LAG_FEATURES for column in columns)
+
+
+def hourly_frame(rows: Sequence[Row]) -> pd.DataFrame:
+    """
+    Convert rows with `created_at` (hour start) and averaged readings
+    into a DataFrame indexed by the hour, as read from the hourly rollups
+
+    Args:
+        rows (Sequence[Row]): Rows as returned by `fetch_rollup_data`
+
+    Returns:
+        pd.DataFrame: Average of every reading column per hour
+    """
+    if not rows:
+        return pd.DataFrame(index=pd.DatetimeIndex([], tz="UTC"))
+
+    df = pd.DataFrame.from_records(rows, columns=list(rows[0]._fields))
+    df = df[[c for c in df.columns if not c.endswith(("_min", "_max"))]]
+    df["created_at"] = pd.to_datetime(df["created_at"], utc=True)
+    return df.set_index("created_at").astype("float32")
+
+
+def build_features(
+    temperature: Sequence[float],
+    humidity: Sequence[float],
+    pressure_mmhg: Sequence[float],
+    timestamps: pd.DatetimeIndex,
+    hourly: pd.DataFrame | None = None,
+    columns: Sequence[str] = FEATURE_COLUMNS,
+) -> pd.DataFrame:
+    """
+    Build the model input for any number of readings at once
+
+    Shared by the predictor and the training pipeline, so both see
+    exactly the same features
+
+    Args:
+        temperature (Sequence[float]): Temperatures in degrees Celsius
+        humidity (Sequence[float]): Humidity in percentage
+        pressure_mmhg (Sequence[float]): Pressure in mmHg
+        timestamps (pd.DatetimeIndex): Times of the readings
+        hourly (pd.DataFrame | None): Hourly averages (see `hourly_frame`)
+                                      for the lag features
+        columns (Sequence[str]): Feature columns the model was trained with
+
+    Returns:
+        pd.DataFrame: Feature matrix with the requested columns, lags that
+                      fall into gaps of the history are NaN
+    """
+    frame = {
+        "Temperature": np.asarray(temperature, dtype=float),
+        "Humidity": np.asarray(humidity, dtype=float),
+        "Pressure (mmHg)": np.asarray(pressure_mmhg, dtype=float),
+        "Month": timestamps.month,
+        "Hour": timestamps.hour,
+        "DayOfMonth": timestamps.day,
+    }
+
+    if uses_history(columns):
+        hours = timestamps.floor("h")
+        # Missing history (e.g. no hourly rollups yet) gives NaN lags as well
+        history = hourly if hourly is not None else hourly_frame([])
+        history = history.reindex(columns=list(LAGGED_COLUMNS))
+        for column in LAGGED_COLUMNS:
+            for lag in LAG_HOURS:
+                earlier = history[column].reindex(hours - pd.Timedelta(hours=lag))
+                frame[lag_column(column, lag)] = earlier.to_numpy(dtype=float)
+
+    return pd.DataFrame(frame, columns=list(columns))
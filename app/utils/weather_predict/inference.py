@@ -0,0 +1,233 @@
+import asyncio
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from logging import getLogger
+
+import numpy as np
+import pandas as pd
+
+from app.config import get_settings
+from app.utils.weather_predict.registry import LoadedModel
+
+logger = getLogger(__name__)
+
+
+def predict_batch(
+    loaded: LoadedModel, features: pd.DataFrame
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Predict temperature and rain for every row of the feature matrix
+    with a single model call
+
+    Args:
+        loaded (LoadedModel): The model and scaler from the model registry
+        features (pd.DataFrame): Feature matrix from `build_features`
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Predicted temperatures (rounded to 0.1)
+                                       and rain flags
+    """
+    y_pred = loaded.model.predict(loaded.scaler.transform(features))
+    return np.round(y_pred[:, 0], 1), y_pred[:, 1] >= 0.5
+
+
+class InferenceRequest:
+    def __init__(
+        self, loaded: LoadedModel, features: pd.DataFrame, future: asyncio.Future
+    ):
+        self.loaded = loaded
+        self.features = features
+        self.future = future
+
+
+class InferenceBatcher:
+    """
+    Runs model inference on a dedicated thread, off the event loop
+
+    Requests that arrive within `batch_window` seconds of each other are
+    concatenated and predicted with a single `model.predict` call. While a
+    batch is running new requests keep queueing, so the batches grow with
+    the load
+
+    Args:
+        queue_size (int): Maximum number of waiting requests
+        batch_window (float): Seconds to wait for more requests after the first
+        max_batch_rows (int): Stop collecting once a batch has this many rows
+        timeout (float): Seconds a request may wait for its result
+    """
+
+    def __init__(
+        self,
+        queue_size: int,
+        batch_window: float,
+        max_batch_rows: int,
+        timeout: float,
+    ):
+        self.queue_size = queue_size
+        self.batch_window = batch_window
+        self.max_batch_rows = max_batch_rows
+        self.timeout = timeout
+        self.queue: asyncio.Queue[InferenceRequest] | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._task: asyncio.Task | None = None
+
+        self.requests = 0
+        self.batched_requests = 0
+        self.batches = 0
+        self.rows = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.max_queue_depth = 0
+        self.last_batch_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """
+        Start the inference thread and the batching loop (no-op if running)
+        """
+        if self.running:
+            return
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="inference"
+        )
+        self._task = asyncio.create_task(self._run(), name="inference-batcher")
+
+    async def stop(self) -> None:
+        """
+        Stop batching, cancel waiting requests and release the thread
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+        while not self.queue.empty():
+            self.queue.get_nowait().future.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    async def predict(
+        self, loaded: LoadedModel, features: pd.DataFrame
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Queue a feature matrix for prediction and wait for the result
+
+        Args:
+            loaded (LoadedModel): The model and scaler from the model registry
+            features (pd.DataFrame): Feature matrix from `build_features`
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The same as `predict_batch`
+
+        Raises:
+            asyncio.QueueFull: If too many requests are already waiting
+            TimeoutError: If the result is not ready within the timeout
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait(InferenceRequest(loaded, features, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise
+        self.requests += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except TimeoutError:
+            self.timeouts += 1
+            raise
+
+    def metrics(self) -> dict:
+        """
+        Get queue depth and batching statistics
+        """
+        return {
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "requests": self.requests,
+            "batches": self.batches,
+            "rows": self.rows,
+            "average_batch_size": (
+                self.batched_requests / self.batches if self.batches else 0
+            ),
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "last_batch_seconds": self.last_batch_seconds,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                await self._process(batch)
+            except Exception as e:
+                logger.exception("Inference batch failed")
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+    async def _collect(self) -> list[InferenceRequest]:
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        rows = len(batch[0].features)
+        deadline = loop.time() + self.batch_window
+
+        while rows < self.max_batch_rows:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                request = await asyncio.wait_for(self.queue.get(), timeout)
+            except TimeoutError:
+                break
+            batch.append(request)
+            rows += len(request.features)
+
+        return batch
+
+    async def _process(self, batch: list[InferenceRequest]) -> None:
+        loop = asyncio.get_running_loop()
+
+        # Requests made during a model reload may use different models
+        groups: dict[LoadedModel, list[InferenceRequest]] = {}
+        for request in batch:
+            if not request.future.done():
+                groups.setdefault(request.loaded, []).append(request)
+
+        for loaded, requests in groups.items():
+            features = pd.concat([r.features for r in requests], ignore_index=True)
+            started = time.perf_counter()
+            temperature, rain = await loop.run_in_executor(
+                self._executor, predict_batch, loaded, features
+            )
+            self.last_batch_seconds = time.perf_counter() - started
+            self.batches += 1
+            self.batched_requests += len(requests)
+            self.rows += len(features)
+
+            offset = 0
+            for request in requests:
+                end = offset + len(request.features)
+                if not request.future.done():
+                    request.future.set_result(
+                        (temperature[offset:end], rain[offset:end])
+                    )
+                offset = end
+
+
+inference_batcher = InferenceBatcher(
+    queue_size=get_settings().INFERENCE_QUEUE_SIZE,
+    batch_window=get_settings().INFERENCE_BATCH_WINDOW,
+    max_batch_rows=get_settings().INFERENCE_MAX_BATCH_ROWS,
+    timeout=get_settings().INFERENCE_TIMEOUT,
+)
@@ -1,64 +1,51 @@
-import joblib
+import math
+
+from datetime import UTC, datetime, timedelta
+
 import pandas as pd
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Central
-from app.utils.queries import get_last_data
-
-
-def predict_weather(
-    temperature: float, humidity: float, pressure_mmhg: float, timestamp: str
-) -> dict:
+from app.utils.queries import (
+    choose_rollup_resolution,
+    fetch_rollup_data,
+    get_last_data,
+)
+from app.utils.weather_predict.cache import prediction_cache
+from app.utils.weather_predict.features import (
+    LAG_HOURS,
+    build_features,
+    hourly_frame,
+    uses_history,
+)
+from app.utils.weather_predict.inference import inference_batcher
+from app.utils.weather_predict.registry import model_registry
+
+# Upper bound for the number of readings in a range prediction
+PREDICTION_MAX_POINTS = 2000
+
+# Central readings as named in the model features
+HISTORY_COLUMNS = {
+    "Temperature": Central.temperature,
+    "Humidity": Central.humidity,
+    "Pressure (mmHg)": Central.pressure,
+}
+
+
+async def fetch_hourly_history(session: AsyncSession, since: datetime) -> pd.DataFrame:
     """
-    Function to predict temperature and rain probability
+    Fetch hourly averages of the Central readings for the lag features
 
     Args:
-        temperature (float): Temperature in degrees Celsius
-        humidity (float): Humidity in percentage
-        pressure_mmhg (float): Pressure in mmHg
-        timestamp (str): Timestamp in the format YYYY-MM-DD HH:MM
+        session (AsyncSession): Asynchronous session for database interaction
+        since (datetime): The earliest hour to fetch
 
     Returns:
-        dict: Dictionary with predicted temperature and rain probability
+        pd.DataFrame: Hourly averages indexed by the hour start
     """
-    # Load the model and scaler
-    model = joblib.load('app/utils/weather_predict/best_model.pkl')
-    scaler = joblib.load('app/utils/weather_predict/scaler.pkl')
-
-    # Convert the timestamp to datetime
-    dt = pd.to_datetime(timestamp)
-    hour = dt.hour
-    day = dt.day
-    month = dt.month
-
-    # Create feature set
-    X_input = pd.DataFrame(
-        [
-            {
-                'Temperature': temperature,
-                'Humidity': humidity,
-                'Pressure (mmHg)': pressure_mmhg,
-                'Month': month,
-                'Hour': hour,
-                'DayOfMonth': day,
-            }
-        ]
-    )
-
-    # Scale the features
-    X_scaled = scaler.transform(X_input)
-
-    # Make predictions
-    y_pred = model.predict(X_scaled)[0]
-    predicted_temp = y_pred[0]
-    predicted_rain = int(y_pred[1] >= 0.5)
-
-    # Return the result
-    return {
-        "predicted_temp": round(predicted_temp, 1),
-        "predicted_rain": bool(predicted_rain),
-    }
+    rows = await fetch_rollup_data(session, Central, HISTORY_COLUMNS, since, 3600)
+    return hourly_frame(rows)
 
 
 async def get_data_weather_prediction(session: AsyncSession):
@@ -66,22 +53,127 @@ async def get_data_weather_prediction(session: AsyncSession):
     Main function that retrieves the latest data from the Central model
     and calls the function to predict values
 
+    Results are cached by the latest Central id and the model version,
+    see `PredictionCache`. Inference itself runs in the inference batcher
+
     Args:
         session (AsyncSession): Asynchronous session for database interaction
 
     Returns:
         dict: Dictionary with predicted temperature and rain probability
+
+    Raises:
+        asyncio.QueueFull: If the inference queue is full
+        TimeoutError: If inference did not finish in time
     """
+    loaded = await model_registry.get()
+    cached = prediction_cache.get_fresh(loaded.version)
+    if cached is not None:
+        return cached
+
     # Retrieve the latest data from the Central model
     last_data = await get_last_data(session, Central)
     if not last_data:
         raise ValueError("No data available in the Central table")
 
-    # Extract necessary data
-    temperature = last_data.temperature
-    humidity = last_data.humidity
-    pressure_mmhg = last_data.pressure
-    timestamp = last_data.created_at.strftime("%Y-%m-%d %H:%M")
+    key = (last_data.id, loaded.version)
+    cached = prediction_cache.get(key)
+    if cached is not None:
+        return cached
+
+    hourly = None
+    if uses_history(loaded.features):
+        since = last_data.created_at - timedelta(hours=max(LAG_HOURS) + 1)
+        hourly = await fetch_hourly_history(session, since)
+
+    features = build_features(
+        [last_data.temperature],
+        [last_data.humidity],
+        [last_data.pressure],
+        pd.DatetimeIndex([last_data.created_at]),
+        hourly=hourly,
+        columns=loaded.features,
+    )
+    # Inference runs off the event loop, batched with concurrent requests
+    predicted_temp, predicted_rain = await inference_batcher.predict(loaded, features)
+
+    result = {
+        "predicted_temp": float(predicted_temp[0]),
+        "predicted_rain": bool(predicted_rain[0]),
+    }
+    prediction_cache.put(key, result)
+    return result
+
+
+async def get_data_weather_prediction_range(session: AsyncSession, hours: int) -> dict:
+    """
+    Predict the weather for every aggregated Central reading of the last
+    specified hours, e.g. to backtest the model or draw a prediction track
+
+    Readings come from the rollups at the finest resolution that keeps the
+    number of points within PREDICTION_MAX_POINTS. Hourly readings of
+    a longer window are thinned to every n-th one to stay within the bound
+
+    Args:
+        session (AsyncSession): Asynchronous session for database interaction
+        hours (int): The number of hours of readings to predict from
+
+    Returns:
+        dict: Used resolution and the list of predictions
+
+    Raises:
+        asyncio.QueueFull: If the inference queue is full
+        TimeoutError: If inference did not finish in time
+    """
+    window = timedelta(hours=hours)
+    since = datetime.now(UTC) - window
+    resolution = choose_rollup_resolution(window, PREDICTION_MAX_POINTS)
+    rows = await fetch_rollup_data(
+        session,
+        Central,
+        {
+            "temperature": Central.temperature,
+            "humidity": Central.humidity,
+            "pressure": Central.pressure,
+        },
+        since,
+        resolution,
+    )
+    if not rows:
+        return {"resolution": resolution, "predictions": []}
+    rows = rows[:: math.ceil(len(rows) / PREDICTION_MAX_POINTS)]
+
+    created_at, temperature, humidity, pressure = zip(
+        *(
+            (row.created_at, row.temperature, row.humidity, row.pressure)
+            for row in rows
+        ),
+        strict=True,
+    )
+    timestamps = pd.DatetimeIndex(created_at)
+
+    loaded = await model_registry.get()
+    hourly = None
+    if uses_history(loaded.features):
+        hourly = await fetch_hourly_history(
+            session, since - timedelta(hours=max(LAG_HOURS) + 1)
+        )
+
+    features = build_features(
+        temperature, humidity, pressure, timestamps, hourly, loaded.features
+    )
+    predicted_temp, predicted_rain = await inference_batcher.predict(loaded, features)
 
-    # Call the prediction function
-    return predict_weather(temperature, humidity, pressure_mmhg, timestamp)
+    predicted_for = timestamps + loaded.horizon
+    return {
+        "resolution": resolution,
+        "predictions": [
+            {
+                "created_at": created_at[i],
+                "predicted_for": predicted_for[i].to_pydatetime(),
+                "predicted_temp": float(predicted_temp[i]),
+                "predicted_rain": bool(predicted_rain[i]),
+            }
+            for i in range(len(rows))
+        ],
+    }
@@ -0,0 +1,160 @@
+import asyncio
+import os
+import time
+
+from datetime import timedelta
+from logging import getLogger
+from typing import Any
+
+import joblib
+
+from app.config import get_settings
+from app.utils.weather_predict.features import FEATURE_COLUMNS, PREDICTION_HORIZON
+
+logger = getLogger(__name__)
+
+
+class LoadedModel:
+    """
+    Model and scaler loaded together from one version of the files
+
+    Args:
+        model: The fitted model
+        scaler: The fitted feature scaler
+        version (tuple[int, int]): Modification times of the model and scaler files
+        features (list[str]): Feature columns the model was trained with
+        horizon (timedelta): How far ahead of the readings the model predicts
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        scaler: Any,
+        version: tuple[int, int],
+        features: list[str] = FEATURE_COLUMNS,
+        horizon: timedelta = PREDICTION_HORIZON,
+    ):
+        self.model = model
+        self.scaler = scaler
+        self.version = version
+        self.features = features
+        self.horizon = horizon
+
+
+class ModelRegistry:
+    """
+    Keeps the prediction model in memory and reloads it when the files change
+
+    The model file is either a plain pickled model with a separate scaler
+    file, or an artifact bundle written by `python -m app.train` that holds
+    the model, the scaler and the feature columns together
+
+    The files are checked at most once per `check_interval` seconds. A new
+    version is loaded in a thread and swapped in at once, so predictions
+    always see a consistent model and scaler pair. If loading fails (e.g. the
+    file is still being written), the previous version keeps serving
+
+    Args:
+        model_path (str): Path to the pickled model
+        scaler_path (str): Path to the pickled scaler
+        mmap_mode (str | None): joblib mmap_mode for numpy arrays, e.g. "r"
+        check_interval (float): Seconds between checks for changed files
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        scaler_path: str,
+        mmap_mode: str | None = None,
+        check_interval: float = 10.0,
+    ):
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.mmap_mode = mmap_mode
+        self.check_interval = check_interval
+        self._current: LoadedModel | None = None
+        self._failed_version: tuple[int, int] | None = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _file_version(self) -> tuple[int, int]:
+        # stat() follows symlinks, so repointing a link to a new artifact counts
+        model_mtime = os.stat(self.model_path).st_mtime_ns
+        try:
+            scaler_mtime = os.stat(self.scaler_path).st_mtime_ns
+        except FileNotFoundError:
+            scaler_mtime = 0
+        return model_mtime, scaler_mtime
+
+    def _load(self, version: tuple[int, int]) -> LoadedModel:
+        artifact = joblib.load(self.model_path, mmap_mode=self.mmap_mode)
+        if isinstance(artifact, dict):
+            return LoadedModel(
+                artifact["model"],
+                artifact["scaler"],
+                version,
+                artifact["features"],
+                timedelta(hours=artifact["horizon_hours"]),
+            )
+
+        scaler = joblib.load(self.scaler_path, mmap_mode=self.mmap_mode)
+        return LoadedModel(artifact, scaler, version)
+
+    async def get(self) -> LoadedModel:
+        """
+        Get the current model, loading or reloading it if the files changed
+
+        Returns:
+            LoadedModel: The model and scaler
+
+        Raises:
+            FileNotFoundError: If no model was loaded and the files are missing
+        """
+        current = self._current
+        now = time.monotonic()
+        if current is not None and now - self._checked_at < self.check_interval:
+            return current
+
+        async with self._lock:
+            if self._current is not None and self._current is not current:
+                return self._current
+            self._checked_at = time.monotonic()
+
+            version = None
+            try:
+                version = self._file_version()
+                if self._current is not None and version in (
+                    self._current.version,
+                    self._failed_version,
+                ):
+                    return self._current
+                loaded = await asyncio.to_thread(self._load, version)
+            except Exception:
+                if self._current is None:
+                    raise
+                self._failed_version = version
+                logger.exception("Failed to reload the model, keeping the old one")
+                return self._current
+
+            if self._current is not None:
+                logger.info("Reloaded the prediction model")
+            self._current = loaded
+            return loaded
+
+    async def preload(self) -> None:
+        """
+        Load the model ahead of the first prediction, logging a failure
+        instead of raising so the app can start without a model
+        """
+        try:
+            await self.get()
+        except Exception:
+            logger.exception("Prediction model is not available")
+
+
+model_registry = ModelRegistry(
+    model_path=get_settings().MODEL_PATH,
+    scaler_path=get_settings().SCALER_PATH,
+    mmap_mode=get_settings().MODEL_MMAP_MODE or None,
+    check_interval=get_settings().MODEL_RELOAD_CHECK_INTERVAL,
+)
@@ -39,5 +39,25 @@ BEGIN
         INSERT INTO settings (key, value, type)
         VALUES ('telegram_webhook_url', 'https://your.domain.com/api/v1/webhook', 'str');
     END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM settings WHERE key = 'retention_raw_days') THEN
+        INSERT INTO settings (key, value, type)
+        VALUES ('retention_raw_days', '7', 'int');
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM settings WHERE key = 'retention_rollup_60_days') THEN
+        INSERT INTO settings (key, value, type)
+        VALUES ('retention_rollup_60_days', '30', 'int');
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM settings WHERE key = 'retention_rollup_600_days') THEN
+        INSERT INTO settings (key, value, type)
+        VALUES ('retention_rollup_600_days', '365', 'int');
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM settings WHERE key = 'retention_rollup_3600_days') THEN
+        INSERT INTO settings (key, value, type)
+        VALUES ('retention_rollup_3600_days', '0', 'int');
+    END IF;
 END
 $$;